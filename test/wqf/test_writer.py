@@ -6,12 +6,15 @@ This module provides unit-level tests for the WQF target product writer.
 """
 
 import json
+import shutil
 import unittest
 from importlib import resources
 from pathlib import Path
 from typing import Any
 
 import numpy as np
+import xarray as xr
+import zarr
 
 from wqf.datasetbuilder import DatasetBuilder
 from wqf.interface.constants import DID_LAT
@@ -53,6 +56,29 @@ class WriterTest(unittest.TestCase):
         dump.unlink()
         file.unlink()
 
+    def test_write_zarr(self):
+        """Tests writing and reading a generated WQF target dataset."""
+        store = Path("fc.zarr")
+        shutil.rmtree(store, ignore_errors=True)
+
+        dataset = self.dataset_builder.build()
+        writer = Writer(self.config, engine="zarr")
+        writer.write(dataset, store)
+        self.assertTrue(store.is_dir())
+
+        name = self.config[VID_CHL]["name"]
+        array = zarr.open_group(store, mode="r")[name]
+        if int(zarr.__version__.split(".")[0]) >= 3:
+            (codec,) = array.compressors
+            self.assertEqual("zstd", codec.cname.value)
+        else:
+            self.assertEqual("zstd", array.compressor.cname)
+        with xr.open_zarr(store) as ds:
+            np.testing.assert_array_equal(
+                dataset[VID_CHL].values, ds[name].values
+            )
+        shutil.rmtree(store)
+
     @property
     def dataset_builder(self):
         shape: tuple[int, int, int] = 3, 469, 527
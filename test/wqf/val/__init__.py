@@ -0,0 +1,7 @@
+#  Copyright (c) Brockmann Consult GmbH, 2024
+#  License: MIT
+
+"""
+This Python package provides unit-level tests for the figure generating
+modules used for product validation.
+"""
@@ -0,0 +1,79 @@
+#  Copyright (c) Brockmann Consult GmbH, 2024
+#  License: MIT
+
+"""
+This module provides unit-level tests for the histograms computed for
+plotting data.
+"""
+
+import unittest
+
+import numpy as np
+from xarray import DataArray
+
+from wqf.val.plots import hist
+from wqf.val.plots import hist1d
+
+
+class HistTest(unittest.TestCase):
+    """Tests the histograms against their NumPy counterparts."""
+
+    x: np.ndarray
+    """The x data, including missing and out-of-range values."""
+
+    y: np.ndarray
+    """The y data, including missing and out-of-range values."""
+
+    def setUp(self):
+        """Initializes the test."""
+        rng = np.random.default_rng(5489)
+        shape = (6, 20, 30)
+        self.x = rng.uniform(-1.0, 9.0, size=shape)
+        self.y = rng.uniform(-3.0, 3.0, size=shape)
+        self.x[rng.random(size=shape) < 0.2] = np.nan
+        self.y[rng.random(size=shape) < 0.2] = np.nan
+        # the upper edges of the histogram range are inside
+        self.x[0, 0, :3] = 8.0
+        self.y[0, 0, :3] = 2.0
+
+    def test_hist(self):
+        bins = (16, 8)
+        hist_range = ((0.0, 8.0), (-2.0, 2.0))
+        valid = ~(np.isnan(self.x) | np.isnan(self.y))
+        x = self.x[valid]
+        y = self.y[valid]
+
+        expected, _, _ = np.histogram2d(x, y, bins, hist_range)
+        actual = hist(self._data(), bins, hist_range)
+        self.assertEqual(bins, actual.shape)
+        np.testing.assert_array_equal(actual.values, expected)
+
+        expected, _, _ = np.histogram2d(x, y, bins, hist_range, density=True)
+        actual = hist(self._data(), bins, hist_range, density=True)
+        np.testing.assert_allclose(actual.values, expected, rtol=1e-5)
+
+    def test_hist1d(self):
+        x = self.x[~np.isnan(self.x)]
+        data = DataArray(self.x).chunk(5)
+
+        expected, edges = np.histogram(x, 16, (0.0, 8.0))
+        actual, actual_edges = hist1d(data, 16, (0.0, 8.0))
+        np.testing.assert_array_equal(actual, expected)
+        np.testing.assert_allclose(actual_edges, edges)
+
+        expected, _ = np.histogram(x, 16, (0.0, 8.0), density=True)
+        actual, _ = hist1d(data, 16, (0.0, 8.0), density=True)
+        np.testing.assert_allclose(actual, expected, rtol=1e-6)
+
+        expected, edges = np.histogram(x, 10)
+        actual, actual_edges = hist1d(data, 10, None)
+        np.testing.assert_array_equal(actual, expected)
+        np.testing.assert_allclose(actual_edges, edges)
+
+    def _data(self) -> tuple[DataArray, DataArray]:
+        """Returns the chunked x and y data."""
+        return DataArray(self.x).chunk(5), DataArray(self.y).chunk(5)
+
+
+if __name__ == "__main__":
+    unittest.main()
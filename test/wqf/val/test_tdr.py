@@ -0,0 +1,61 @@
+#  Copyright (c) Brockmann Consult GmbH, 2024
+#  License: MIT
+
+"""
+This module provides unit-level tests for the reductions used for
+producing figures for the Test (Site) Data Report (TDR).
+"""
+
+import unittest
+
+import numpy as np
+from xarray import DataArray
+
+from wqf.val.tdr import mean_std
+from wqf.val.tdr import quantiles
+
+
+class TdrTest(unittest.TestCase):
+    """Tests the reductions along time ignoring missing values."""
+
+    a: DataArray
+    """The chunked test data, including a pixel with missing values only."""
+
+    def setUp(self):
+        """Initializes the test."""
+        rng = np.random.default_rng(5489)
+        data = rng.exponential(size=(20, 4, 5)).astype(np.float32)
+        data[rng.random(size=data.shape) < 0.3] = np.nan
+        data[:, 1, 2] = np.nan
+        self.a = DataArray(data, dims=("time", "lat", "lon")).chunk(
+            {"time": 5, "lat": 2, "lon": 2}
+        )
+
+    def test_quantiles(self):
+        q = (0.0, 0.005, 0.5, 0.995, 1.0)
+        expected = np.nanquantile(self.a.values, q, axis=0)
+
+        actual = quantiles(self.a, q, "time")
+        self.assertEqual(len(q), len(actual))
+        for i, qa in enumerate(actual):
+            self.assertEqual(("lat", "lon"), qa.dims)
+            np.testing.assert_allclose(qa.values, expected[i], rtol=1e-6)
+        self.assertTrue(np.isnan(actual[0].values[1, 2]))
+
+    def test_mean_std(self):
+        m, s = mean_std(self.a, "time")
+
+        self.assertEqual(("lat", "lon"), m.dims)
+        self.assertEqual(("lat", "lon"), s.dims)
+        np.testing.assert_allclose(
+            m.values, self.a.mean("time").values, rtol=1e-5
+        )
+        np.testing.assert_allclose(
+            s.values, self.a.std("time", ddof=0).values, rtol=1e-5
+        )
+        self.assertTrue(np.isnan(m.values[1, 2]))
+        self.assertTrue(np.isnan(s.values[1, 2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,7 @@ import unittest
 from xgboost import Booster
 
 from wqf import xgb
+from wqf.algorithms.forecast import Forecast
 
 
 class RegistryTest(unittest.TestCase):
@@ -33,6 +34,23 @@ class RegistryTest(unittest.TestCase):
         self.assertFalse("unregistered" in reg)
         self.assertRaises(KeyError, reg.model, "unregistered")
 
+    def test_registry_is_singleton(self):
+        self.assertIs(xgb.registry(), xgb.registry())
+
+    def test_config_is_shared(self):
+        config = xgb.Registry()._config
+
+        self.assertIs(xgb.Registry._shared_config, config)
+        self.assertIs(xgb.Registry()._config, config)
+
+    def test_model_is_cached(self):
+        self.assertIs(
+            xgb.registry().model("default"), xgb.registry().model("default")
+        )
+
+        booster, _ = Forecast.load_model("ns-coastal")
+        self.assertIs(xgb.registry().model("ns-coastal"), booster)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -196,7 +196,7 @@ class Forecast(BlockAlgorithm):
     ) -> tuple[Booster, list[tuple[int, tuple[int, str]]]]:
         """This method does not belong to public API."""
         reg = xgb.registry()
-        booster = Booster(model_file=reg.file(spec) if spec in reg else spec)
+        booster = reg.model(spec) if spec in reg else Booster(model_file=spec)
         columns = {}
         for i, name in enumerate(booster.feature_names):
             if name.startswith("t-"):
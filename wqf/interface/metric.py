@@ -30,6 +30,22 @@ class Metric(metaclass=ABCMeta):
         :return: The total metric score.
         """
 
+    @abstractmethod
+    def total(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
+        """
+        Evaluates the total metric score lazily.
+
+        Unlike `value`, this method does not compute the score, so that
+        its computation can be combined with the computation of other
+        scores.
+
+        :param ref: The reference data cube.
+        :param pre: The predicted data cube.
+        :param kwargs: Any keyword arguments.
+        :return: The total metric score, which is a zero-dimensional
+        data array.
+        """
+
     @abstractmethod
     def image(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
         """
@@ -19,7 +19,10 @@ from .interface.reading import Reading
 
 _KEY_CHUNKS: str = "config.wqf.reader.chunks"
 """
-The key to configure chunking. The default is `{}`.
+The key to configure chunking. A chunk size of `0` selects the chunk size
+of the data on disk, and a chunk size of `-1` a single chunk along the
+dimension. The default is `{}`, which selects the chunks of the data on
+disk for all dimensions.
 """
 
 _KEY_ENGINE: str = "config.wqf.reader.engine"
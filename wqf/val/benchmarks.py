@@ -6,6 +6,7 @@ This module provides several benchmark methods used for product validation,
 which is described in the Product Validation Plan.
 """
 from typing import Any
+from typing import Iterable
 
 import dask.array as da
 from dask.array import Array
@@ -186,6 +187,39 @@ class XGB(Benchmark):
         pre = test[VID_CHL]
         return align_nodata(ref, pre, min_pixels=min_pixels)
 
+    def predict_horizons(
+        self,
+        cube: Dataset,
+        *,
+        min_pixels: int = 0,
+        horizons: Iterable[int] = (1, 2, 3, 4, 5, 6, 7),
+    ) -> dict[int, tuple[DataArray, DataArray]]:
+        """
+        Performs XGB model forecasts for several forecast horizons.
+
+        The reference data and the number of observations in each time
+        step of the reference data are shared by all forecast horizons.
+
+        :param cube: The reference dataset.
+        :param min_pixels: The minimum number of observations in a time step.
+        :param horizons: The forecast horizons.
+        :return: The observed values and corresponding forecast values for
+        each forecast horizon.
+        """
+        ref = cube[VID_CHL]
+        count = None
+        if min_pixels > 0:
+            count = ref.count([DID_LAT, DID_LON]).compute()
+        return {
+            h: align_nodata(
+                ref,
+                self.read(h)[VID_CHL],
+                min_pixels=min_pixels,
+                count=count,
+            )
+            for h in horizons
+        }
+
     def read(self, h: int) -> Dataset:
         """
         Reads an XGB forecast model test dataset.
@@ -231,9 +265,17 @@ def align_nodata(
     ref: DataArray,
     pre: DataArray,
     min_pixels: int = 0,
+    count: DataArray | None = None,
 ) -> tuple[DataArray, DataArray]:
     """
     Returns mutually nullified reference and forecast data.
+
+    :param ref: The reference data.
+    :param pre: The forecast data.
+    :param min_pixels: The minimum number of observations in a time step.
+    :param count: The number of observations in each time step of the
+    reference data, if computed already.
+    :return: The nullified reference and forecast data.
     """
     assert (
         ref.shape[1:] == pre.shape[1:]
@@ -251,9 +293,11 @@ def align_nodata(
         pre = pre.sel({DID_TIM: slice(beg, end)})
     if min_pixels > 0:
         msk = da.full(ref.shape, True, chunks=ref.chunks)
-        msk[ref.count([DID_LAT, DID_LON]).compute() < min_pixels, :, :] = (
-            False
-        )
+        if count is None:
+            count = ref.count([DID_LAT, DID_LON]).compute()
+        else:
+            count = count.sel({DID_TIM: ref.coords[VID_TIM]})
+        msk[count < min_pixels, :, :] = False
         return ref.where(msk), pre.where(msk)
     else:
         return ref, pre
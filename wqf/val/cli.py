@@ -0,0 +1,37 @@
+#  Copyright (c) Brockmann Consult GmbH, 2024
+#  License: MIT
+
+"""
+This module defines the command line setup shared by the figure generating
+commands used for product validation.
+"""
+from argparse import ArgumentDefaultsHelpFormatter
+from argparse import ArgumentParser
+
+
+def create_parser(prog: str, description: str) -> ArgumentParser:
+    """
+    Returns a new command line argument parser, which accepts the data
+    cube identifier and the option to read from AWS team store.
+
+    :param prog: The name of the command.
+    :param description: The description of the command.
+    :return: The argument parser.
+    """
+    parser = ArgumentParser(
+        prog=prog,
+        description=description,
+        epilog="Copyright (c) Brockmann Consult GmbH, 2024. License: MIT",
+        exit_on_error=True,
+        formatter_class=ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("cube_id", help="the data cube identifier")
+    parser.add_argument(
+        "--aws",
+        help="read from AWS team store",
+        action="store_true",
+        default=False,
+        required=False,
+        dest="aws",
+    )
+    return parser
@@ -27,6 +27,18 @@ def _select(
     return ref, pre
 
 
+def _median(a: DataArray) -> DataArray:
+    """
+    Returns the median of all values, lazily.
+
+    Dask does not support the median over all dimensions of an array,
+    so the values are merged into a single chunk before.
+    """
+    return DataArray(
+        data=da.nanmedian(da.asarray(a.data).rechunk(-1).ravel(), axis=0)
+    )
+
+
 class Bias(Metric):
     """
     The bias.
@@ -36,7 +48,10 @@ class Bias(Metric):
     """
 
     def value(self, ref: DataArray, pre: DataArray, **kwargs) -> Number:
-        return Bias.err(ref, pre).mean().values.item()
+        return self.total(ref, pre).values.item()
+
+    def total(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
+        return Bias.err(ref, pre).mean()
 
     def image(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
         return Bias.err(ref, pre).mean(DID_TIM)
@@ -67,7 +82,10 @@ class Count(Metric):
     """
 
     def value(self, ref: DataArray, pre: DataArray, *kwargs) -> Number:
-        return da.isfinite(ref - pre.data).sum().values.item()
+        return self.total(ref, pre).values.item()
+
+    def total(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
+        return da.isfinite(ref - pre.data).sum()
 
     def image(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
         counts = (
@@ -92,13 +110,16 @@ class MAD(Metric):
     """
 
     def value(self, ref: DataArray, pre: DataArray, **kwargs) -> Number:
-        return MAD.ad(ref, pre).compute().median().values.item()
+        return self.total(ref, pre).values.item()
+
+    def total(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
+        return _median(MAD.ad(ref, pre))
 
     def image(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
         return MAD.ad(ref, pre).median(DID_TIM)
 
     def series(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
-        return MAD.ad(ref, pre).compute().median([DID_LAT, DID_LON])
+        return MAD.ad(ref, pre).median([DID_LAT, DID_LON])
 
     @staticmethod
     def ad(
@@ -125,7 +146,16 @@ class MAPD(Metric):
         *,
         condition: DataArray | None = None,
     ) -> Number:
-        return MAPD.apd(ref, pre, condition).compute().median().values.item()
+        return self.total(ref, pre, condition=condition).values.item()
+
+    def total(
+        self,
+        ref: DataArray,
+        pre: DataArray,
+        *,
+        condition: DataArray | None = None,
+    ) -> DataArray:
+        return _median(MAPD.apd(ref, pre, condition))
 
     def image(
         self,
@@ -143,9 +173,7 @@ class MAPD(Metric):
         *,
         condition: DataArray | None = None,
     ) -> DataArray:
-        return (
-            MAPD.apd(ref, pre, condition).compute().median([DID_LAT, DID_LON])
-        )
+        return MAPD.apd(ref, pre, condition).median([DID_LAT, DID_LON])
 
     @staticmethod
     def apd(
@@ -169,10 +197,13 @@ class R2(Metric):
     """
 
     def value(self, ref: DataArray, pre: DataArray, **kwargs) -> Number:
+        return self.total(ref, pre).values.item()
+
+    def total(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
         ref, pre = _select(ref, pre, da.isfinite(ref - pre.data))
         ssr = da.square(ref - pre.data).sum()
         sst = da.square(ref - ref.mean()).sum()
-        return (1.0 - ssr / sst).values.item()
+        return 1.0 - ssr / sst
 
     def image(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
         ref, pre = _select(ref, pre, da.isfinite(ref - pre.data))
@@ -198,7 +229,10 @@ class RMSE(Metric):
     """
 
     def value(self, ref: DataArray, pre: DataArray, **kwargs) -> Number:
-        return da.sqrt(RMSE.se(ref, pre).mean()).values.item()
+        return self.total(ref, pre).values.item()
+
+    def total(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
+        return da.sqrt(RMSE.se(ref, pre).mean())
 
     def image(self, ref: DataArray, pre: DataArray, **kwargs) -> DataArray:
         return da.sqrt(RMSE.se(ref, pre).mean(DID_TIM))
@@ -231,7 +265,20 @@ class WRMSSE(Metric):
         b: int = 5,
         h: int = 1,
     ) -> Number:
-        return WRMSSE.rmsse(ref, pre, condition, b, h).mean().values.item()
+        return self.total(
+            ref, pre, condition=condition, b=b, h=h
+        ).values.item()
+
+    def total(
+        self,
+        ref: DataArray,
+        pre: DataArray,
+        *,
+        condition: DataArray | None = None,
+        b: int = 5,
+        h: int = 1,
+    ) -> DataArray:
+        return WRMSSE.rmsse(ref, pre, condition, b, h).mean()
 
     def image(
         self,
@@ -6,8 +6,6 @@ This code produces plots to create a movie.
 """
 
 import warnings
-from argparse import ArgumentDefaultsHelpFormatter
-from argparse import ArgumentParser
 from numbers import Number
 from pathlib import Path
 
@@ -16,10 +14,13 @@ from matplotlib import colors as plc
 from xarray import DataArray
 
 from wqf.algorithms.gaussian import Gaussian
+from wqf.interface.constants import DID_LAT
+from wqf.interface.constants import DID_LON
 from wqf.interface.constants import DID_TIM
 from wqf.readerfactory import ReaderFactory
 from wqf.val.benchmarks import BGC
 from wqf.val.benchmarks import XGB
+from wqf.val.cli import create_parser
 from wqf.val.period import Period
 from wqf.val.plots import ScenePlot
 
@@ -27,25 +28,17 @@ warnings.filterwarnings(
     "ignore",
 )
 
+_MAX_COMPUTE_BYTES = 256 * 2**20
+"""
+Data to be plotted, which are smaller than this number of bytes, are
+computed at once before plotting.
+"""
+
 
 def plot_analysis(chl: DataArray, period: Period):
     chl = period.slice(chl)
 
-    for t in range(chl.shape[0]):
-        time = np.datetime_as_string(chl.coords[DID_TIM].values[t], unit="D")
-        file = f"an___{time}"
-        if Path(f"{file}.png").exists():
-            continue
-        ScenePlot().plot(
-            chl[t],
-            title=f"(Re)analysis {time}",
-            fn=file,
-            cbar_label=r"chlorophyll concentration (mg m$^{-3}$)",
-            norm=plc.SymLogNorm(1.0, linscale=0.1, vmin=0.0, vmax=100.0),
-            xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
-            vmin=0.0,
-            vmax=100.0,
-        ).clear()
+    plot_series(chl, "an___", "(Re)analysis")
 
 
 def plot_forecast(
@@ -62,21 +55,7 @@ def plot_forecast(
             attrs=chl.attrs,
         )
 
-    for t in range(chl.shape[0]):
-        time = np.datetime_as_string(chl.coords[DID_TIM].values[t], unit="D")
-        file = f"fc_{h}_{time}"
-        if Path(f"{file}.png").exists():
-            continue
-        ScenePlot().plot(
-            chl[t],
-            title=f"{h}-day forecast {time}",
-            fn=file,
-            cbar_label=r"chlorophyll concentration (mg m$^{-3}$)",
-            norm=plc.SymLogNorm(1.0, linscale=0.1, vmin=0.0, vmax=100.0),
-            xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
-            vmin=0.0,
-            vmax=100.0,
-        ).clear()
+    plot_series(chl, f"fc_{h}_", f"{h}-day forecast")
 
 
 def plot_observed(chl: DataArray, period: Period, fwhm: Number | None):
@@ -91,21 +70,37 @@ def plot_observed(chl: DataArray, period: Period, fwhm: Number | None):
             attrs=chl.attrs,
         )
 
-    for t in range(chl.shape[0]):
-        time = np.datetime_as_string(chl.coords[DID_TIM].values[t], unit="D")
-        file = f"in___{time}"
-        if Path(f"{file}.png").exists():
-            continue
-        ScenePlot().plot(
-            chl[t],
-            title=f"Observed {time}",
-            fn=file,
-            cbar_label=r"chlorophyll concentration (mg m$^{-3}$)",
-            norm=plc.SymLogNorm(1.0, linscale=0.1, vmin=0.0, vmax=100.0),
-            xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
-            vmin=0.0,
-            vmax=100.0,
-        ).clear()
+    plot_series(chl, "in___", "Observed")
+
+
+def plot_series(chl: DataArray, prefix: str, caption: str):
+    times = np.datetime_as_string(chl.coords[DID_TIM].values, unit="D")
+    steps = [
+        t
+        for t, time in enumerate(times)
+        if not Path(f"{prefix}{time}.png").exists()
+    ]
+    if not steps:
+        return
+
+    chl = chl[steps]
+    if chl.dtype == np.float64:  # but not below, symlog underflows
+        chl = chl.astype(np.float32, copy=False)
+    if chl.nbytes < _MAX_COMPUTE_BYTES:
+        chl = chl.compute()
+    elif chl.chunks is not None:  # one chunk per time step
+        chl = chl.chunk({DID_TIM: 1, DID_LAT: -1, DID_LON: -1})
+
+    ScenePlot().plot_series(
+        chl,
+        titles=[f"{caption} {times[t]}" for t in steps],
+        fns=[f"{prefix}{times[t]}" for t in steps],
+        cbar_label=r"chlorophyll concentration (mg m$^{-3}$)",
+        norm=plc.SymLogNorm(1.0, linscale=0.1, vmin=0.0, vmax=100.0),
+        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        vmin=0.0,
+        vmax=100.0,
+    ).clear()
 
 
 def generate_figures(args):
@@ -137,24 +132,12 @@ def generate_figures(args):
 
 
 if __name__ == "__main__":
-    parser = ArgumentParser(
-        prog="wqf-mov",
-        description="This command produces figures to create a movie.",
-        epilog="Copyright (c) Brockmann Consult GmbH, 2024. License: MIT",
-        exit_on_error=True,
-        formatter_class=ArgumentDefaultsHelpFormatter,
+    parser = create_parser(
+        "wqf-mov",
+        "This command produces figures to create a movie.",
     )
-    parser.add_argument("cube_id", help="the data cube identifier")
     parser.add_argument("bgcm_id", help="the BGCM data identifier")
     parser.add_argument("xgbm_id", help="the XGBM data identifier")
-    parser.add_argument(
-        "--aws",
-        help="read from AWS team store",
-        action="store_true",
-        default=False,
-        required=False,
-        dest="aws",
-    )
     parser.add_argument(
         "--analysis",
         help="plot BGCM (re)analysis",
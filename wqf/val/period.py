@@ -3,6 +3,7 @@
 
 """This module defines a plain time period class."""
 
+import numpy as np
 from xarray import DataArray
 
 from ..interface.constants import VID_TIM
@@ -20,6 +21,12 @@ class Period:
         """
         self._beg = beg
         self._end = beg if end is None else end
+        # the bounds of the period are converted only once
+        self._time_slice = slice(
+            np.datetime64(f"{self._beg}-01-01", "ns"),
+            np.datetime64(f"{self._end + 1}-01-01", "ns")
+            - np.timedelta64(1, "ns"),
+        )
 
     def slice(self, a: DataArray) -> DataArray:
         """
@@ -29,9 +36,7 @@ class Period:
         :return: The slice of the data array which is covered by this
         time period.
         """
-        return a.sel(
-            {VID_TIM: slice(f"{self._beg}-01-01", f"{self._end}-12-31")}
-        )
+        return a.sel({VID_TIM: self._time_slice})
 
     def str(self, sep: str) -> str:
         """
@@ -4,6 +4,13 @@
 """
 This module defines several functions for plotting data.
 """
+import os
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from threading import get_ident
 from typing import Any
 
 import dask.array as da
@@ -15,7 +22,10 @@ from cartopy.feature import NaturalEarthFeature
 from matplotlib import colors as plc
 from matplotlib import pyplot as plt
 from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
 from matplotlib.figure import Figure
+from PIL import Image
 from xarray import DataArray
 from xarray import Dataset
 
@@ -25,6 +35,31 @@ _LAND = NaturalEarthFeature(
     "physical", "land", "10m", edgecolor="face", facecolor="#e8e5db"
 )
 
+_SAVE_WORKERS = 4
+"""The number of threads writing figures to file in the background."""
+
+_SAVE_POOL = ThreadPoolExecutor(max_workers=_SAVE_WORKERS)
+"""The thread pool for writing figures to file in the background."""
+
+_SAVES: deque = deque()
+"""The pending writes of figures to file."""
+
+_DRAW_LOCK = Lock()
+"""
+The lock to draw figures one at a time. Matplotlib is not thread-safe,
+so figures plotted concurrently are drawn in turn, while their data are
+computed concurrently.
+"""
+
+_SAVES_LOCK = Lock()
+"""The lock to bound the number of pending writes of figures to file."""
+
+_MAX_SAVES = 2 * _SAVE_WORKERS
+"""
+The maximum number of pending writes of figures to file. Each pending
+write holds an image buffer in memory.
+"""
+
 
 class ScenePlot(Plot):
     """
@@ -52,23 +87,93 @@ class ScenePlot(Plot):
         vmin: Any | None = None,
         vmax: Any | None = None,
     ) -> Figure:
+        data = data.compute()
         if projection is None:
-            mid_lat = round(data.lat.mean().item(), ndigits=1)
-            mid_lon = round(data.lon.mean().item(), ndigits=1)
-            max_lat = np.ceil(data.lat.max()).item()
-            min_lat = np.floor(data.lat.min()).item()
-            projection = LambertConformal(
-                central_latitude=mid_lat,
-                central_longitude=mid_lon,
-                standard_parallels=(min_lat, max_lat),
+            projection = _projection(data)
+        with _DRAW_LOCK:
+            fig, ax = _subplots(show, projection=projection)
+            cbar_kwargs = {}
+            if cbar_label is not None:
+                cbar_kwargs["label"] = cbar_label
+            data.plot(
+                ax=ax,
+                x="lon",
+                y="lat",
+                robust=True,
+                transform=PlateCarree(),
+                vmin=vmin,
+                vmax=vmax,
+                norm=norm,
+                cmap=cmap,
+                cbar_kwargs=cbar_kwargs,
             )
-        fig, ax = plt.subplots(
-            subplot_kw={"projection": projection},
-        )
+            ax.add_feature(_LAND)
+            ax.autoscale_view()
+            ax.gridlines(
+                alpha=0.1,
+                draw_labels={"bottom": "x", "left": "y"},
+                x_inline=False,
+                y_inline=False,
+                xlocs=xlocs,
+                ylocs=ylocs,
+            )
+            if title is not None:
+                ax.set_title(title)
+            if fn is not None:
+                _save(fig, fn, dpi=300, tight=True)
+            if show:
+                fig.show()
+                plt.close()
+        return fig
+
+    def plot_series(
+        self,
+        data: DataArray,
+        titles: list[str],
+        fns: list[str],
+        *,
+        cbar_label: str | None = None,
+        cmap: str = "viridis",
+        norm: plc.Normalize | None = None,
+        projection: Projection | None = None,
+        xlocs: tuple[Any, ...] | None = None,
+        ylocs: tuple[Any, ...] | None = None,
+        vmin: Any | None = None,
+        vmax: Any | None = None,
+        dpi: int = 300,
+    ) -> Figure:
+        """
+        Plots a series of scenes, one for each time step, into a single
+        figure, which is reused for all time steps. Only the data and the
+        title are updated from one time step to the next.
+
+        The static parts of the figure (land, grid lines, and color bar)
+        are drawn once and cached. The data are normalized by means of a
+        lookup table, which is computed once for all time steps, too. The
+        images are encoded and written to file in the background, while
+        the next time step is drawn.
+
+        :param data: The data, time is the first dimension.
+        :param titles: The titles, one for each time step.
+        :param fns: The file names, one for each time step.
+        :param cbar_label: The label of the color bar.
+        :param cmap: The color map.
+        :param norm: The normalization of the data.
+        :param projection: The projection.
+        :param xlocs: The longitude grid line locations.
+        :param ylocs: The latitude grid line locations.
+        :param vmin: The minimum of the color scale.
+        :param vmax: The maximum of the color scale.
+        :param dpi: The resolution of the images.
+        :return: The plot.
+        """
+        if projection is None:
+            projection = _projection(data)
+        fig, ax = _subplots(False, dpi=dpi, projection=projection)
         cbar_kwargs = {}
         if cbar_label is not None:
             cbar_kwargs["label"] = cbar_label
-        data.plot(
+        mesh = data[0].plot(
             ax=ax,
             x="lon",
             y="lat",
@@ -78,8 +183,15 @@ class ScenePlot(Plot):
             vmax=vmax,
             norm=norm,
             cmap=cmap,
-            cbar_kwargs=cbar_kwargs,
+            add_colorbar=False,
         )
+        norm = mesh.norm
+        fig.colorbar(
+            ScalarMappable(norm=norm, cmap=mesh.cmap), ax=ax, **cbar_kwargs
+        )
+        # normalize by table lookup, which is computed only once
+        lut = _lut(norm)
+        mesh.set_norm(plc.NoNorm())
         ax.add_feature(_LAND)
         ax.autoscale_view()
         ax.gridlines(
@@ -90,13 +202,33 @@ class ScenePlot(Plot):
             xlocs=xlocs,
             ylocs=ylocs,
         )
-        if title is not None:
-            ax.set_title(title)
-        if fn is not None:
-            fig.savefig(f"{fn}.png", bbox_inches="tight", dpi=300)
-        if show:
-            fig.show()
-        plt.close()
+        # only the data and the title are drawn for each time step, on
+        # top of a background, which is drawn once
+        mesh.set_animated(True)
+        ax.title.set_animated(True)
+        background = None
+        crop = None
+        pending = deque()
+        workers = 2
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for t, (title, fn) in enumerate(zip(titles, fns)):
+                mesh.set_array(_apply_lut(_frame(data[t]), norm, lut))
+                ax.set_title(title)
+                if background is None:
+                    fig.canvas.draw()
+                    background = fig.canvas.copy_from_bbox(fig.bbox)
+                    crop = _tight(fig)
+                else:
+                    fig.canvas.restore_region(background)
+                ax.draw_artist(mesh)
+                ax.draw_artist(ax.title)
+                fig.canvas.blit(fig.bbox)
+                buf = np.asarray(fig.canvas.buffer_rgba())[crop].copy()
+                if len(pending) == workers:
+                    pending.popleft().result()
+                pending.append(executor.submit(_write_png, fn, buf, dpi))
+            for future in pending:
+                future.result()
         return fig
 
 
@@ -123,16 +255,16 @@ class HistogramPlot(Plot):
         log: bool = False,
         hist_range: tuple[Any, Any] | None = None,
     ) -> Figure:
-        fig, ax = plt.subplots()
-        data.plot.hist(
-            ax=ax, bins=bins, range=hist_range, density=density, log=log
-        )
-        decorate(ax, xlabel, ylabel, xlim, ylim, title)
-        if fn is not None:
-            fig.savefig(f"{fn}.pdf")
-        if show:
-            fig.show()
-        plt.close()
+        h, edges = hist1d(data, bins, hist_range, density)
+        with _DRAW_LOCK:
+            fig, ax = _subplots(show)
+            ax.bar(edges[:-1], h, width=np.diff(edges), align="edge", log=log)
+            decorate(ax, xlabel, ylabel, xlim, ylim, title)
+            if fn is not None:
+                fig.savefig(f"{fn}.pdf")
+            if show:
+                fig.show()
+                plt.close()
         return fig
 
 
@@ -163,27 +295,29 @@ class DensityPlot(Plot):
         vmin: Any | None = None,
         vmax: Any | None = None,
     ) -> Figure:
-        fig, ax = plt.subplots()
-        cbar_kwargs = {}
-        if cbar_label is not None:
-            cbar_kwargs["label"] = cbar_label
-        hist(data, bins, hist_range, density).plot(
-            ax=ax,
-            x="x",
-            y="y",
-            robust=True,
-            vmin=vmin,
-            vmax=vmax,
-            norm=norm,
-            cmap=cmap,
-            cbar_kwargs=cbar_kwargs,
-        )
-        decorate(ax, xlabel, ylabel, xlim, ylim, title)
-        if fn is not None:
-            fig.savefig(f"{fn}.png", dpi=300)
-        if show:
-            fig.show()
-        plt.close()
+        h = hist(data, bins, hist_range, density).compute()
+        with _DRAW_LOCK:
+            fig, ax = _subplots(show)
+            cbar_kwargs = {}
+            if cbar_label is not None:
+                cbar_kwargs["label"] = cbar_label
+            h.plot(
+                ax=ax,
+                x="x",
+                y="y",
+                robust=True,
+                vmin=vmin,
+                vmax=vmax,
+                norm=norm,
+                cmap=cmap,
+                cbar_kwargs=cbar_kwargs,
+            )
+            decorate(ax, xlabel, ylabel, xlim, ylim, title)
+            if fn is not None:
+                _save(fig, fn, dpi=300)
+            if show:
+                fig.show()
+                plt.close()
         return fig
 
 
@@ -209,22 +343,25 @@ class ScatterPlot(Plot):
         point_color: str | None = None,
         point_marker: str | None = ".",
         sample_count: int = 4000,
+        seed: int | None = None,
     ) -> Figure:
-        fig, ax = plt.subplots()
-        rand(data, sample_count).plot.scatter(
-            ax=ax,
-            x="x",
-            y="y",
-            alpha=point_alpha,
-            c=point_color,
-            marker=point_marker,
-        )
-        decorate(ax, xlabel, ylabel, xlim, ylim, title)
-        if fn is not None:
-            fig.savefig(f"{fn}.png", dpi=300)
-        if show:
-            fig.show()
-        plt.close()
+        samples = rand(data, sample_count, seed)
+        with _DRAW_LOCK:
+            fig, ax = _subplots(show)
+            samples.plot.scatter(
+                ax=ax,
+                x="x",
+                y="y",
+                alpha=point_alpha,
+                c=point_color,
+                marker=point_marker,
+            )
+            decorate(ax, xlabel, ylabel, xlim, ylim, title)
+            if fn is not None:
+                _save(fig, fn, dpi=300)
+            if show:
+                fig.show()
+                plt.close()
         return fig
 
 
@@ -253,19 +390,20 @@ class TimeSeriesPlot(Plot):
         point_marker: str = ".",
         group_by: str | None = "time.month",
     ) -> Figure:
-        fig, ax = plt.subplots()
-
-        if group_by is not None:
-            for _, period in time_series(data).groupby(group_by):
-                period.plot.scatter(ax=ax, marker=point_marker)
-        else:
-            time_series(data).scatter(ax=ax, marker=point_marker)
-        decorate(ax, xlabel, ylabel, xlim, ylim, title)
-        if fn is not None:
-            fig.savefig(f"{fn}.png", dpi=300)
-        if show:
-            fig.show()
-        plt.close()
+        data = data.compute()
+        with _DRAW_LOCK:
+            fig, ax = _subplots(show)
+            if group_by is not None:
+                for _, period in time_series(data).groupby(group_by):
+                    period.plot.scatter(ax=ax, marker=point_marker)
+            else:
+                time_series(data).scatter(ax=ax, marker=point_marker)
+            decorate(ax, xlabel, ylabel, xlim, ylim, title)
+            if fn is not None:
+                _save(fig, fn, dpi=300)
+            if show:
+                fig.show()
+                plt.close()
         return fig
 
 
@@ -291,6 +429,166 @@ def time_series(ts: DataArray):
     )
 
 
+def _subplots(
+    show: bool, dpi: int | None = None, **subplot_kw
+) -> tuple[Figure, Axes]:
+    """
+    Returns a new figure with a single subplot.
+
+    Only figures to be shown are managed by pyplot. Any other figure is
+    rendered by an Agg canvas of its own, which avoids the bookkeeping
+    of pyplot and does not require closing the figure.
+
+    :param show: Whether the figure will be shown.
+    :param dpi: The resolution of the figure.
+    :param subplot_kw: The keyword arguments for creating the subplot.
+    :return: The figure and the axes of the subplot.
+    """
+    if show:
+        return plt.subplots(dpi=dpi, subplot_kw=subplot_kw)
+    fig = Figure(dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(1, 1, 1, **subplot_kw)
+
+
+def _projection(data: DataArray) -> Projection:
+    """Returns a Lambert conformal projection centered on the data."""
+    mid_lat = round(data.lat.mean().item(), ndigits=1)
+    mid_lon = round(data.lon.mean().item(), ndigits=1)
+    max_lat = np.ceil(data.lat.max()).item()
+    min_lat = np.floor(data.lat.min()).item()
+    return LambertConformal(
+        central_latitude=mid_lat,
+        central_longitude=mid_lon,
+        standard_parallels=(min_lat, max_lat),
+    )
+
+
+def _frame(data: DataArray) -> np.ma.MaskedArray:
+    """Returns the masked values of a scene, as expected by a quad mesh."""
+    return np.ma.masked_invalid(data.transpose("lat", "lon").values)
+
+
+def _lut(norm: plc.Normalize, n: int = 65536) -> np.ndarray:
+    """
+    Returns a lookup table for the normalization of data.
+
+    :param norm: The normalization, the limits must be set.
+    :param n: The number of table entries, which are equally spaced
+    between the lower and upper limit of the normalization.
+    :return: The lookup table.
+    """
+    x = np.linspace(norm.vmin, norm.vmax, n)
+    return np.ma.filled(norm(x), np.nan).astype(np.single)
+
+
+def _apply_lut(
+    data: np.ma.MaskedArray, norm: plc.Normalize, lut: np.ndarray
+) -> np.ma.MaskedArray:
+    """
+    Normalizes data by table lookup. Data outside the limits of the
+    normalization are clipped.
+
+    :param data: The data.
+    :param norm: The normalization, which the lookup table refers to.
+    :param lut: The lookup table.
+    :return: The normalized data.
+    """
+    n = lut.shape[0]
+    i = np.rint(
+        (np.ma.filled(data, norm.vmin) - norm.vmin)
+        * ((n - 1) / (norm.vmax - norm.vmin))
+    )
+    i = np.clip(i, 0, n - 1).astype(np.intp)
+    return np.ma.masked_array(lut[i], mask=np.ma.getmaskarray(data))
+
+
+def _tight(fig: Figure, pad: float = 0.1) -> tuple[slice, slice]:
+    """
+    Returns the rows and columns of the tight bounding box of a figure,
+    which has been drawn already.
+
+    :param fig: The figure.
+    :param pad: The padding (inches) around the tight bounding box.
+    :return: The rows and columns of the tight bounding box in the
+    figure pixel buffer.
+    """
+    w, h = fig.bbox.width, fig.bbox.height
+    x0, y0, x1, y1 = (
+        fig.get_tightbbox(fig.canvas.get_renderer()).padded(pad).extents
+        * fig.dpi
+    )
+    rows = slice(max(int(h - y1), 0), min(int(np.ceil(h - y0)), int(h)))
+    cols = slice(max(int(x0), 0), min(int(np.ceil(x1)), int(w)))
+    return rows, cols
+
+
+def _write_png(fn: str, buf: np.ndarray, dpi: int):
+    """
+    Writes an RGBA image buffer to a PNG file.
+
+    The image is written to a temporary file first, which replaces the
+    target file when complete, so an interrupted write does not leave a
+    truncated file, which would be taken as already plotted.
+    """
+    target = Path(f"{fn}.png")
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.{get_ident()}")
+    try:
+        Image.fromarray(buf).save(
+            tmp, format="PNG", compress_level=1, dpi=(dpi, dpi)
+        )
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def flush():
+    """
+    Waits until all figures saved in the background have been written to
+    file.
+
+    :raises Exception: If writing a figure to file has failed.
+    """
+    while _SAVES:
+        _SAVES.popleft().result()
+
+
+def _save(fig: Figure, fn: str, dpi: int, tight: bool = False):
+    """
+    Saves a figure to a PNG file in the background.
+
+    The figure is drawn on the calling thread, because figures are not
+    thread-safe. Only the encoding and writing of the image is done in
+    the background, while the caller continues with the next figure.
+
+    :param fig: The figure.
+    :param fn: The file name, without extension.
+    :param dpi: The resolution of the image.
+    :param tight: Whether to crop the image to the tight bounding box of
+    the figure.
+    """
+    if not isinstance(fig.canvas, FigureCanvasAgg):
+        bbox_inches = "tight" if tight else None
+        fig.savefig(f"{fn}.png", bbox_inches=bbox_inches, dpi=dpi)
+        return
+    # wait for the oldest pending write, to bound the memory held by
+    # image buffers, when figures are saved by many threads
+    oldest: Future | None = None
+    with _SAVES_LOCK:
+        if len(_SAVES) >= _MAX_SAVES:
+            oldest = _SAVES.popleft()
+    if oldest is not None:
+        oldest.result()
+    fig_dpi = fig.dpi
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    buf = np.asarray(fig.canvas.buffer_rgba())
+    buf = (buf[_tight(fig)] if tight else buf).copy()
+    fig.set_dpi(fig_dpi)
+    _SAVES.append(_SAVE_POOL.submit(_write_png, fn, buf, dpi))
+
+
 def coords(edges: da.Array) -> da.Array:
     """Returns the coordinate values for given bin edges."""
     return (edges[:-1] + edges[1:]) / 2.0
@@ -319,6 +617,34 @@ def decorate(
         ax.set_title(title)
 
 
+def hist1d(
+    data: DataArray,
+    bins: int | None,
+    hist_range: tuple[Any, Any] | None,
+    density: bool = False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a one-dimensional histogram of the given data and the bin
+    edges. The histogram is computed block by block, without loading the
+    data into memory as a whole. Missing values are ignored.
+
+    :param data: The data.
+    :param bins: The number of histogram bins.
+    :param hist_range: The range of the histogram. If `None`, the range
+    of the data is used.
+    :param density: If `False`, the histogram gives the number of samples for
+    each bin. If `True`, the histogram shows the probability density function
+    for each bin.
+    """
+    x = da.asarray(data.data)
+    if bins is None:
+        bins = plt.rcParams["hist.bins"]
+    if hist_range is None:
+        hist_range = da.compute(da.nanmin(x), da.nanmax(x))
+    h, edges = da.histogram(x, bins=bins, range=hist_range, density=density)
+    return h.compute(), edges
+
+
 def hist(
     data: tuple[DataArray, DataArray],
     bins: tuple[int, int] | None,
@@ -346,9 +672,23 @@ def hist(
         x.chunks == y.chunks
     ), f"chunks do not match: {x.chunks} != {y.chunks}"
 
-    h, x, y = da.histogram2d(
-        x, y, bins=bins, range=hist_range, density=density
-    )
+    n = x.ndim
+    chunks = tuple((1,) * k for k in x.numblocks)
+    h = da.map_blocks(
+        _hist2d,
+        x,
+        y,
+        bins=bins,
+        hist_range=hist_range,
+        new_axis=[n, n + 1],
+        chunks=chunks + ((bins[0],), (bins[1],)),
+        dtype=np.uint32,
+    ).sum(axis=tuple(range(n)), dtype=np.uint32)
+    x = np.linspace(*hist_range[0], bins[0] + 1)
+    y = np.linspace(*hist_range[1], bins[1] + 1)
+    if density:
+        area = np.outer(np.diff(x), np.diff(y)).astype(np.single)
+        h = h.astype(np.single) / (h.sum().astype(np.single) * area)
     return DataArray(
         data=h,
         coords=[
@@ -359,31 +699,83 @@ def hist(
     )
 
 
-def rand(data: [DataArray, DataArray], sample_count: int) -> Dataset:
+def _hist2d(
+    x: np.ndarray,
+    y: np.ndarray,
+    bins: tuple[int, int],
+    hist_range: tuple[tuple[Any, Any], tuple[Any, Any]],
+) -> np.ndarray:
+    """
+    Returns the two-dimensional histogram of a single block of data.
+
+    The bins are regular, so the bin indices are computed arithmetically
+    and the samples are counted by a single `np.bincount`, instead of
+    searching the bin edges like `np.histogram2d` does. Like the latter,
+    the last bin includes its upper edge, and samples outside the range
+    of the histogram or with missing values are ignored.
+
+    The number counts are accumulated as unsigned 32-bit integers. The
+    histogram is expanded by a unit dimension for each dimension of the
+    block, to be concatenated with the histograms of the other blocks.
+    """
+    (x_min, x_max), (y_min, y_max) = hist_range
+    m, n = bins
+    shape = (1,) * x.ndim + (m, n)
+    x = x.ravel()
+    y = y.ravel()
+    inside = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+    i = ((x[inside] - x_min) * (m / (x_max - x_min))).astype(np.intp)
+    j = ((y[inside] - y_min) * (n / (y_max - y_min))).astype(np.intp)
+    np.minimum(i, m - 1, out=i)
+    np.minimum(j, n - 1, out=j)
+    h = np.bincount(i * n + j, minlength=m * n)
+    return h.astype(np.uint32).reshape(shape)
+
+
+def rand(
+    data: [DataArray, DataArray], sample_count: int, seed: int | None = None
+) -> Dataset:
     """
     Returns a dataset of (x, y) samples randomly drawn from the data
     supplied as argument.
 
     :param data: The x and y data.
     :param sample_count: The number of random samples to draw.
+    :param seed: The seed of a random state of its own to draw the
+    samples from. If `None`, the samples are drawn from the global random
+    state, which is not reproducible when drawing samples concurrently.
     :return: The dataset of random samples.
     """
     x: da.Array = _x(data)
     y: da.Array = _y(data)
-    i: da.Array = da.random.randint(low=0, high=x.size, size=sample_count)
+    random = da.random if seed is None else da.random.RandomState(seed)
+    i: da.Array = random.randint(low=0, high=x.size, size=sample_count)
+    i = np.unravel_index(i.compute(), x.shape)
+    # gather both samples at once, to read shared blocks only once
+    x, y = da.compute(x.vindex[i], y.vindex[i])
     return Dataset(
         data_vars={
-            "x": DataArray(data=x[i].compute(), dims="sample_count"),
-            "y": DataArray(data=y[i].compute(), dims="sample_count"),
+            "x": DataArray(data=x, dims="sample_count"),
+            "y": DataArray(data=y, dims="sample_count"),
         }
     )
 
 
 def _x(data: tuple[DataArray, DataArray]) -> da.Array:
-    """Returns the x data."""
-    return data[0].data.ravel()
+    """
+    Returns the x data.
+
+    The data are not flattened, because flattening a chunked array
+    requires rechunking.
+    """
+    return data[0].data
 
 
 def _y(data: tuple[DataArray, DataArray]) -> da.Array:
-    """Returns the y data."""
-    return data[1].data.ravel()
+    """
+    Returns the y data.
+
+    The data are not flattened, because flattening a chunked array
+    requires rechunking.
+    """
+    return data[1].data
@@ -4,12 +4,15 @@
 """
 This module defines plots corresponding to the Product Validation Plan (PVP).
 """
+import os
 import warnings
-from argparse import ArgumentDefaultsHelpFormatter
-from argparse import ArgumentParser
+from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
+import dask
 import dask.array as da
+import matplotlib
 import numpy as np
 from matplotlib import colors as plc
 from matplotlib.figure import Figure
@@ -18,6 +21,7 @@ from xarray import DataArray
 from wqf.interface.constants import VID_CHL
 from wqf.readerfactory import ReaderFactory
 from wqf.val.benchmarks import Naive
+from wqf.val.cli import create_parser
 from wqf.val.metrics import Bias
 from wqf.val.metrics import Count
 from wqf.val.metrics import MAD
@@ -25,21 +29,73 @@ from wqf.val.metrics import MAPD
 from wqf.val.metrics import R2
 from wqf.val.metrics import RMSE
 from wqf.val.metrics import WRMSSE
+from wqf.val.period import Period
 from wqf.val.plots import DensityPlot
 from wqf.val.plots import HistogramPlot
 from wqf.val.plots import ScatterPlot
 from wqf.val.plots import ScenePlot
 from wqf.val.plots import TimeSeriesPlot
+from wqf.val.plots import flush
 
 warnings.filterwarnings(
     "ignore",
 )
 
+matplotlib.use("Agg")
+
+# plots are stateless and shared by all plot functions
+_DENSITY = DensityPlot()
+_HIST = HistogramPlot()
+_SCATTER = ScatterPlot()
+_SCENE = ScenePlot()
+_SERIES = TimeSeriesPlot()
+
+_XLOCS = (1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0)
+"""The longitude grid line locations used for plotting scenes."""
+
+
+@lru_cache
+def _datetime_lim(
+    lim: tuple[int, int]
+) -> tuple[np.datetime64, np.datetime64]:
+    """Returns the time axis limits for given limiting years."""
+    return np.datetime64(f"{lim[0]}-01-01"), np.datetime64(f"{lim[1]}-01-01")
+
+
+def _symlog_norm() -> plc.SymLogNorm:
+    """
+    Returns a new normalization for plotting probability densities. Norms
+    are modified when drawing a color bar, so they are not shared between
+    plots.
+    """
+    return plc.SymLogNorm(0.0001, vmin=0.0, vmax=1.0)
+
+
+def _skip(fn: str | None, ext: str = "png") -> bool:
+    """
+    Returns `True` if a figure has been written to file already and need
+    not be plotted again, unless the environment variable
+    `WQF_FORCE_REPLOT` is set.
+    """
+    return (
+        fn is not None
+        and not os.environ.get("WQF_FORCE_REPLOT")
+        and Path(f"{fn}.{ext}").exists()
+    )
+
+
+def clear(fig: Figure | None):
+    """Clears a figure, unless plotting has been skipped."""
+    if fig is not None:
+        fig.clear()
+
 
 def plot_bias_scene(
     data: DataArray, title: str | None = None, fn: str | None = None
-) -> Figure:
-    return ScenePlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SCENE.plot(
         data,
         title=title,
         fn=fn,
@@ -47,7 +103,7 @@ def plot_bias_scene(
         cmap="cividis",
         vmin=-1.5,
         vmax=1.5,
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
     )
 
 
@@ -57,18 +113,13 @@ def plot_bias_time_series(
     fn: str | None = None,
     xlim: tuple[int, int] | None = None,
     ylim: tuple[Any, Any] = (-1.5, 1.5),
-) -> Figure:
-    return TimeSeriesPlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SERIES.plot(
         data,
         ylabel=r"bias (mg m$^{-3}$)",
-        xlim=(
-            (
-                np.datetime64(f"{xlim[0]}-01-01"),
-                np.datetime64(f"{xlim[1]}-01-01"),
-            )
-            if xlim is not None
-            else None
-        ),
+        xlim=_datetime_lim(xlim) if xlim is not None else None,
         ylim=ylim,
         title=title,
         fn=fn,
@@ -77,29 +128,33 @@ def plot_bias_time_series(
 
 def plot_count_scene(
     data: DataArray, title: str | None = None, fn: str | None = None
-) -> Figure:
-    return ScenePlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SCENE.plot(
         data,
         title=title,
         fn=fn,
         cbar_label="number of forecasts",
         vmin=0.0,
         vmax=250.0,
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
     )
 
 
 def plot_determination_coefficient_scene(
     data: DataArray, title: str | None = None, fn: str | None = None
-) -> Figure:
-    return ScenePlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SCENE.plot(
         data,
         title=title,
         fn=fn,
         cbar_label="coefficient of determination",
         vmin=0.0,
         vmax=1.0,
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
     )
 
 
@@ -109,18 +164,13 @@ def plot_determination_coefficient_time_series(
     fn: str | None = None,
     xlim: tuple[int, int] | None = None,
     ylim: tuple[Any, Any] = (-1.0, 1.0),
-) -> Figure:
-    return TimeSeriesPlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SERIES.plot(
         data,
         ylabel="coefficient of determination",
-        xlim=(
-            (
-                np.datetime64(f"{xlim[0]}-01-01"),
-                np.datetime64(f"{xlim[1]}-01-01"),
-            )
-            if xlim is not None
-            else None
-        ),
+        xlim=_datetime_lim(xlim) if xlim is not None else None,
         ylim=ylim,
         title=title,
         fn=fn,
@@ -129,15 +179,17 @@ def plot_determination_coefficient_time_series(
 
 def plot_mad_scene(
     data: DataArray, title: str | None = None, fn: str | None = None
-) -> Figure:
-    return ScenePlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SCENE.plot(
         data,
         title=title,
         fn=fn,
         cbar_label=r"MAD (mg m$^{-3}$)",
         vmin=1.0,
         vmax=7.0,
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
     )
 
 
@@ -147,18 +199,13 @@ def plot_mad_time_series(
     fn: str | None = None,
     xlim: tuple[int, int] | None = None,
     ylim: tuple[Any, Any] = (0.0, 6.0),
-) -> Figure:
-    return TimeSeriesPlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SERIES.plot(
         data,
         ylabel=r"MAD (mg m$^{-3}$)",
-        xlim=(
-            (
-                np.datetime64(f"{xlim[0]}-01-01"),
-                np.datetime64(f"{xlim[1]}-01-01"),
-            )
-            if xlim is not None
-            else None
-        ),
+        xlim=_datetime_lim(xlim) if xlim is not None else None,
         ylim=ylim,
         title=title,
         fn=fn,
@@ -167,15 +214,17 @@ def plot_mad_time_series(
 
 def plot_mapd_scene(
     data: DataArray, title: str | None = None, fn: str | None = None
-) -> Figure:
-    return ScenePlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SCENE.plot(
         data,
         title=title,
         fn=fn,
         cbar_label=r"MAPD ($10^2$)",
         vmin=0.0,
         vmax=1.0,
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
     )
 
 
@@ -185,18 +234,13 @@ def plot_mapd_time_series(
     fn: str | None = None,
     xlim: tuple[int, int] | None = None,
     ylim: tuple[Any, Any] = (0.0, 1.0),
-) -> Figure:
-    return TimeSeriesPlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SERIES.plot(
         data,
         ylabel=r"MAPD ($10^2$)",
-        xlim=(
-            (
-                np.datetime64(f"{xlim[0]}-01-01"),
-                np.datetime64(f"{xlim[1]}-01-01"),
-            )
-            if xlim is not None
-            else None
-        ),
+        xlim=_datetime_lim(xlim) if xlim is not None else None,
         ylim=ylim,
         title=title,
         fn=fn,
@@ -205,15 +249,17 @@ def plot_mapd_time_series(
 
 def plot_rmse_scene(
     data: DataArray, title: str | None = None, fn: str | None = None
-) -> Figure:
-    return ScenePlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SCENE.plot(
         data,
         title=title,
         fn=fn,
         cbar_label=r"RMSE (mg m$^{-3}$)",
         vmin=1.0,
         vmax=7.0,
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
     )
 
 
@@ -223,18 +269,13 @@ def plot_rmse_time_series(
     fn: str | None = None,
     xlim: tuple[int, int] | None = None,
     ylim: tuple[Any, Any] = (0.0, 7.0),
-) -> Figure:
-    return TimeSeriesPlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SERIES.plot(
         data,
         ylabel=r"RMSE (mg m$^{-3}$)",
-        xlim=(
-            (
-                np.datetime64(f"{xlim[0]}-01-01"),
-                np.datetime64(f"{xlim[1]}-01-01"),
-            )
-            if xlim is not None
-            else None
-        ),
+        xlim=_datetime_lim(xlim) if xlim is not None else None,
         ylim=ylim,
         title=title,
         fn=fn,
@@ -243,15 +284,17 @@ def plot_rmse_time_series(
 
 def plot_wrmsse_scene(
     data: DataArray, title: str | None = None, fn: str | None = None
-) -> Figure:
-    return ScenePlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SCENE.plot(
         data,
         title=title,
         fn=fn,
         cbar_label="WRMSSE",
         vmin=1.0,
         vmax=7.0,
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
     )
 
 
@@ -261,18 +304,13 @@ def plot_wrmsse_time_series(
     fn: str | None = None,
     xlim: tuple[int, int] | None = None,
     ylim: tuple[Any, Any] = (0.0, 7.0),
-) -> Figure:
-    return TimeSeriesPlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SERIES.plot(
         data,
         ylabel="WRMSSE",
-        xlim=(
-            (
-                np.datetime64(f"{xlim[0]}-01-01"),
-                np.datetime64(f"{xlim[1]}-01-01"),
-            )
-            if xlim is not None
-            else None
-        ),
+        xlim=_datetime_lim(xlim) if xlim is not None else None,
         ylim=ylim,
         title=title,
         fn=fn,
@@ -283,8 +321,10 @@ def plot_value_density(
     data: tuple[DataArray, DataArray],
     title: str | None = None,
     fn: str | None = None,
-) -> Figure:
-    return DensityPlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _DENSITY.plot(
         data,
         xlabel=r"reference chlorophyll concentration (mg m$^{-3}$)",
         ylabel=r"forecast (mg m$^{-3}$)",
@@ -293,7 +333,7 @@ def plot_value_density(
         bins=(30, 30),
         cbar_label=r"probability density (m$^{6}$ mg$^{-2}$)",
         hist_range=((0.0, 30.0), (0.0, 30.0)),
-        norm=plc.SymLogNorm(0.0001, vmin=0.0, vmax=1.0),
+        norm=_symlog_norm(),
     )
 
 
@@ -301,8 +341,11 @@ def plot_value_scatter(
     data: tuple[DataArray, DataArray],
     title: str | None = None,
     fn: str | None = None,
-) -> Figure:
-    return ScatterPlot().plot(
+    seed: int | None = None,
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SCATTER.plot(
         data,
         xlabel=r"reference chlorophyll concentration (mg m$^{-3}$)",
         ylabel=r"forecast (mg m$^{-3}$)",
@@ -310,6 +353,7 @@ def plot_value_scatter(
         ylim=(-0.50, 30.5),
         title=title,
         fn=fn,
+        seed=seed,
     )
 
 
@@ -317,8 +361,10 @@ def plot_error_density(
     data: tuple[DataArray, DataArray],
     title: str | None = None,
     fn: str | None = None,
-) -> Figure:
-    return DensityPlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _DENSITY.plot(
         data,
         xlabel=r"reference chlorophyll concentration (mg m$^{-3}$)",
         ylabel=r"forecast error (mg m$^{-3}$)",
@@ -327,7 +373,7 @@ def plot_error_density(
         bins=(30, 31),
         cbar_label=r"probability density (m$^{6}$ mg$^{-2}$)",
         hist_range=((0.0, 30.0), (-15.5, 15.5)),
-        norm=plc.SymLogNorm(0.0001, vmin=0.0, vmax=1.0),
+        norm=_symlog_norm(),
     )
 
 
@@ -335,8 +381,11 @@ def plot_error_scatter(
     data: tuple[DataArray, DataArray],
     title: str | None = None,
     fn: str | None = None,
-) -> Figure:
-    return ScatterPlot().plot(
+    seed: int | None = None,
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SCATTER.plot(
         data,
         xlabel=r"reference chlorophyll concentration (mg m$^{-3}$)",
         ylabel=r"forecast error (mg m$^{-3}$)",
@@ -344,6 +393,7 @@ def plot_error_scatter(
         ylim=(-15.5, 15.5),
         title=title,
         fn=fn,
+        seed=seed,
     )
 
 
@@ -351,8 +401,10 @@ def plot_error_histogram(
     data: DataArray,
     title: str | None = None,
     fn: str | None = None,
-) -> Figure:
-    return HistogramPlot().plot(
+) -> Figure | None:
+    if _skip(fn, "pdf"):
+        return None
+    return _HIST.plot(
         data,
         xlabel=r"forecast error (mg m$^{-3}$)",
         ylabel=r"probability density (m$^{3}$ mg$^{-1}$)",
@@ -369,8 +421,10 @@ def plot_relative_error_density(
     data: tuple[DataArray, DataArray],
     title: str | None = None,
     fn: str | None = None,
-) -> Figure:
-    return DensityPlot().plot(
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _DENSITY.plot(
         data,
         xlabel=r"reference chlorophyll concentration (mg m$^{-3}$)",
         ylabel="forecast relative error",
@@ -379,7 +433,7 @@ def plot_relative_error_density(
         bins=(30, 31),
         cbar_label=r"probability density (m$^{3}$ mg$^{-1}$)",
         hist_range=((0.0, 30.0), (-1.55, 1.55)),
-        norm=plc.SymLogNorm(0.0001, vmin=0.0, vmax=1.0),
+        norm=_symlog_norm(),
     )
 
 
@@ -387,8 +441,11 @@ def plot_relative_error_scatter(
     data: tuple[DataArray, DataArray],
     title: str | None = None,
     fn: str | None = None,
-) -> Figure:
-    return ScatterPlot().plot(
+    seed: int | None = None,
+) -> Figure | None:
+    if _skip(fn):
+        return None
+    return _SCATTER.plot(
         data,
         xlabel="reference chlorophyll concentration (mg m$^{-3}$)",
         ylabel="forecast relative error",
@@ -396,6 +453,7 @@ def plot_relative_error_scatter(
         ylim=(-1.55, 1.55),
         title=title,
         fn=fn,
+        seed=seed,
     )
 
 
@@ -403,8 +461,10 @@ def plot_relative_error_histogram(
     data: DataArray,
     title: str | None = None,
     fn: str | None = None,
-) -> Figure:
-    return HistogramPlot().plot(
+) -> Figure | None:
+    if _skip(fn, "pdf"):
+        return None
+    return _HIST.plot(
         data,
         xlabel="forecast relative error",
         ylabel="probability density",
@@ -423,146 +483,179 @@ def generate_figures(args, period: tuple[int, int]):
     reader = ReaderFactory.create_reader(args.aws)
     cube = reader.read(args.cube_id, depth_level=3.0)
     ref, pre = Naive().predict(cube[VID_CHL])
+    ref, pre = dask.persist(ref, pre)
+
+    clear(
+        plot_bias_time_series(
+            Bias().series(ref, pre),
+            "Mockup chlorophyll forecast",
+            "bias_mockup_series",
+            xlim=period,
+        )
+    )
+    clear(
+        plot_bias_scene(
+            Bias().image(ref, pre),
+            "Mockup chlorophyll forecast",
+            "bias_mockup_image",
+        )
+    )
+    clear(
+        plot_error_histogram(
+            Bias.err(ref, pre),
+            "Mockup chlorophyll forecast",
+            "err_mockup_hist",
+        )
+    )
+    clear(
+        plot_relative_error_histogram(
+            Bias.rer(ref, pre, condition=ref > 1.0),
+            "Mockup chlorophyll forecast",
+            "rer_mockup_hist",
+        )
+    )
+
+    clear(
+        plot_count_scene(
+            Count().image(ref, pre),
+            "Mockup chlorophyll forecast",
+            "count_mockup_image",
+        )
+    )
+
+    clear(
+        plot_determination_coefficient_time_series(
+            R2().series(ref, pre),
+            "Mockup chlorophyll forecast",
+            "det_mockup_series",
+            xlim=period,
+        )
+    )
+    clear(
+        plot_determination_coefficient_scene(
+            R2().image(ref, pre),
+            "Mockup chlorophyll forecast",
+            "det_mockup_image",
+        )
+    )
+
+    clear(
+        plot_mad_time_series(
+            MAD().series(ref, pre),
+            "Mockup chlorophyll forecast",
+            "mad_mockup_series",
+            xlim=period,
+        )
+    )
+    clear(
+        plot_mad_scene(
+            MAD().image(ref, pre),
+            "Mockup chlorophyll forecast",
+            "mad_mockup_image",
+        )
+    )
 
-    plot_bias_time_series(
-        Bias().series(ref, pre),
-        "Mockup chlorophyll forecast",
-        "bias_mockup_series",
-        xlim=period,
-    ).clear()
-    plot_bias_scene(
-        Bias().image(ref, pre),
-        "Mockup chlorophyll forecast",
-        "bias_mockup_image",
-    ).clear()
-    plot_error_histogram(
-        Bias.err(ref, pre),
-        "Mockup chlorophyll forecast",
-        "err_mockup_hist",
-    ).clear()
-    plot_relative_error_histogram(
-        Bias.rer(ref, pre, condition=ref > 1.0),
-        "Mockup chlorophyll forecast",
-        "rer_mockup_hist",
-    ).clear()
-
-    plot_count_scene(
-        Count().image(ref, pre),
-        "Mockup chlorophyll forecast",
-        "count_mockup_image",
-    ).clear()
-
-    plot_determination_coefficient_time_series(
-        R2().series(ref, pre),
-        "Mockup chlorophyll forecast",
-        "det_mockup_series",
-        xlim=period,
-    ).clear()
-    plot_determination_coefficient_scene(
-        R2().image(ref, pre),
-        "Mockup chlorophyll forecast",
-        "det_mockup_image",
-    ).clear()
-
-    plot_mad_time_series(
-        MAD().series(ref, pre),
-        "Mockup chlorophyll forecast",
-        "mad_mockup_series",
-        xlim=period,
-    ).clear()
-    plot_mad_scene(
-        MAD().image(ref, pre),
-        "Mockup chlorophyll forecast",
-        "mad_mockup_image",
-    ).clear()
-
-    plot_mapd_time_series(
-        MAPD().series(ref, pre, condition=ref > 1.0),
-        "Mockup chlorophyll forecast",
-        "mapd_mockup_series",
-        xlim=period,
-    ).clear()
-    plot_mapd_scene(
-        MAPD().image(ref, pre, condition=ref > 1.0),
-        "Mockup chlorophyll forecast",
-        "mapd_mockup_image",
-    ).clear()
-
-    plot_rmse_time_series(
-        RMSE().series(ref, pre),
-        "Mockup chlorophyll forecast",
-        "rmse_mockup_series",
-        xlim=period,
-    ).clear()
-    plot_rmse_scene(
-        RMSE().image(ref, pre),
-        "Mockup chlorophyll forecast",
-        "rmse_mockup_image",
-    ).clear()
-
-    plot_wrmsse_time_series(
-        WRMSSE().series(ref, pre, condition=ref > 1.0),
-        "Mockup chlorophyll forecast",
-        "wrmsse_mockup_series",
-        xlim=period,
-    ).clear()
-    plot_wrmsse_scene(
-        WRMSSE().image(ref, pre, condition=ref > 1.0),
-        "Mockup chlorophyll forecast",
-        "wrmsse_mockup_image",
-    ).clear()
-
-    x = ref.loc[f"{period[0]}-01-01" :f"{period[1]}-01-01", :, :]
-    y = pre.loc[f"{period[0]}-01-01" :f"{period[1]}-01-01", :, :]
-
-    plot_value_density(
-        (x, y),
-        "Mockup chlorophyll forecast",
-        "val_mockup_density",
-    ).clear()
-    plot_value_scatter(
-        (x, y),
-        "Mockup chlorophyll forecast",
-        "val_mockup_scatter",
-    ).clear()
-    plot_error_density(
-        (x, y - x),
-        "Mockup chlorophyll forecast",
-        "err_mockup_density",
-    ).clear()
-    plot_error_scatter(
-        (x, y - x),
-        "Mockup chlorophyll forecast",
-        "err_mockup_scatter",
-    ).clear()
-    plot_relative_error_density(
-        (x, (y - x) / x),
-        "Mockup chlorophyll forecast",
-        "rer_mockup_density",
-    ).clear()
-    plot_relative_error_scatter(
-        (x, (y - x) / x),
-        "Mockup chlorophyll forecast",
-        "rer_mockup_scatter",
-    ).clear()
+    clear(
+        plot_mapd_time_series(
+            MAPD().series(ref, pre, condition=ref > 1.0),
+            "Mockup chlorophyll forecast",
+            "mapd_mockup_series",
+            xlim=period,
+        )
+    )
+    clear(
+        plot_mapd_scene(
+            MAPD().image(ref, pre, condition=ref > 1.0),
+            "Mockup chlorophyll forecast",
+            "mapd_mockup_image",
+        )
+    )
+
+    clear(
+        plot_rmse_time_series(
+            RMSE().series(ref, pre),
+            "Mockup chlorophyll forecast",
+            "rmse_mockup_series",
+            xlim=period,
+        )
+    )
+    clear(
+        plot_rmse_scene(
+            RMSE().image(ref, pre),
+            "Mockup chlorophyll forecast",
+            "rmse_mockup_image",
+        )
+    )
+
+    clear(
+        plot_wrmsse_time_series(
+            WRMSSE().series(ref, pre, condition=ref > 1.0),
+            "Mockup chlorophyll forecast",
+            "wrmsse_mockup_series",
+            xlim=period,
+        )
+    )
+    clear(
+        plot_wrmsse_scene(
+            WRMSSE().image(ref, pre, condition=ref > 1.0),
+            "Mockup chlorophyll forecast",
+            "wrmsse_mockup_image",
+        )
+    )
+
+    p = Period(period[0], period[1] - 1)
+    x = p.slice(ref)
+    y = p.slice(pre)
+
+    clear(
+        plot_value_density(
+            (x, y),
+            "Mockup chlorophyll forecast",
+            "val_mockup_density",
+        )
+    )
+    clear(
+        plot_value_scatter(
+            (x, y),
+            "Mockup chlorophyll forecast",
+            "val_mockup_scatter",
+        )
+    )
+    clear(
+        plot_error_density(
+            (x, y - x),
+            "Mockup chlorophyll forecast",
+            "err_mockup_density",
+        )
+    )
+    clear(
+        plot_error_scatter(
+            (x, y - x),
+            "Mockup chlorophyll forecast",
+            "err_mockup_scatter",
+        )
+    )
+    clear(
+        plot_relative_error_density(
+            (x, (y - x) / x),
+            "Mockup chlorophyll forecast",
+            "rer_mockup_density",
+        )
+    )
+    clear(
+        plot_relative_error_scatter(
+            (x, (y - x) / x),
+            "Mockup chlorophyll forecast",
+            "rer_mockup_scatter",
+        )
+    )
+    flush()
 
 
 if __name__ == "__main__":
-    parser = ArgumentParser(
-        prog="wqf-pvp",
-        description="This command produces figures for the Product "
+    parser = create_parser(
+        "wqf-pvp",
+        "This command produces figures for the Product "
         "Validation Plan (PVP).",
-        epilog="Copyright (c) Brockmann Consult GmbH, 2024. License: MIT",
-        exit_on_error=True,
-        formatter_class=ArgumentDefaultsHelpFormatter,
-    )
-    parser.add_argument("cube_id", help="the data cube identifier")
-    parser.add_argument(
-        "--aws",
-        help="reading from AWS team store",
-        action="store_true",
-        default=False,
-        required=False,
-        dest="aws",
     )
     generate_figures(parser.parse_args(), (2016, 2021))
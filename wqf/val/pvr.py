@@ -5,10 +5,13 @@
 This module produces plots for the Product Validation Report (PVR).
 """
 import warnings
-from argparse import ArgumentDefaultsHelpFormatter
-from argparse import ArgumentParser
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable
 
-import dask.array as da
+import dask
+import matplotlib
 from xarray import DataArray
 
 from wqf.interface.constants import VID_CHL
@@ -19,6 +22,7 @@ from wqf.val.benchmarks import Naive
 from wqf.val.benchmarks import SES
 from wqf.val.benchmarks import SNaive
 from wqf.val.benchmarks import XGB
+from wqf.val.cli import create_parser
 from wqf.val.metrics import Bias
 from wqf.val.metrics import Count
 from wqf.val.metrics import MAD
@@ -27,6 +31,8 @@ from wqf.val.metrics import R2
 from wqf.val.metrics import RMSE
 from wqf.val.metrics import WRMSSE
 from wqf.val.period import Period
+from wqf.val.plots import flush
+from wqf.val.pvp import clear
 from wqf.val.pvp import plot_bias_scene
 from wqf.val.pvp import plot_bias_time_series
 from wqf.val.pvp import plot_count_scene
@@ -53,296 +59,426 @@ warnings.filterwarnings(
     "ignore",
 )
 
+matplotlib.use("Agg")
+
 _MIN_PIXELS = 30000
 """
 The validation does not consider time steps (i.e., days) with less than
 this number of cloud free pixels.
 """
 
+_MAX_JOBS = 2
+"""
+The maximum number of benchmarks validated concurrently. Each benchmark
+holds its forecast and the slices of two periods in memory.
+"""
+
+
+def bias_tasks(ref: DataArray, pre: DataArray) -> dict[str, DataArray]:
+    return {
+        "bias_value": Bias().total(ref, pre),
+        "bias_series": Bias().series(ref, pre),
+        "bias_image": Bias().image(ref, pre),
+        "count_value": Count().total(ref, pre),
+        "count_image": Count().image(ref, pre),
+    }
+
 
 def plot_bias_diagrams(
-    ref: DataArray, pre: DataArray, method: str, period: Period
-):
-    ref = period.slice(ref)
-    pre = period.slice(pre)
+    results: dict[str, DataArray],
+    ref: DataArray,
+    pre: DataArray,
+    condition: DataArray,
+    method: str,
+    period: Period,
+) -> list[str]:
+    value = results["bias_value"].item()
+    lines = [f"Bias .............. ({method}) {period}: {value:6.2f}"]
+    value = results["count_value"].item()
+    lines.append(f"Count ............. ({method}) {period}: {value}")
 
-    value = Bias().value(ref, pre)
-    print(
-        f"Bias .............. ({method}) {period}: {value:6.2f}",
-        flush=True,
+    title = f"{method} forecast {period}"
+    clear(
+        plot_bias_time_series(
+            results["bias_series"],
+            title,
+            f"bias_{method}_series_{period.str('_')}",
+            xlim=period.lim,
+        )
     )
-    value = Count().value(ref, pre)
-    print(f"Count ............. ({method}) {period}: {value}", flush=True)
+    clear(
+        plot_bias_scene(
+            results["bias_image"],
+            title,
+            f"bias_{method}_image_{period.str('_')}",
+        )
+    )
+    clear(
+        plot_error_histogram(
+            Bias().err(ref, pre),
+            title,
+            f"err_{method}_hist_{period.str('_')}",
+        )
+    )
+    clear(
+        plot_relative_error_histogram(
+            Bias().rer(ref, pre, condition=condition),
+            title,
+            f"rer_{method}_hist_{period.str('_')}",
+        )
+    )
+    clear(
+        plot_count_scene(
+            results["count_image"],
+            title,
+            f"count_{method}_image_{period.str('_')}",
+        )
+    )
+    return lines
 
-    title = f"{method} forecast {period}"
-    plot_bias_time_series(
-        Bias().series(ref, pre),
-        title,
-        f"bias_{method}_series_{period.str('_')}",
-        xlim=period.lim,
-    ).clear()
-    plot_bias_scene(
-        Bias().image(ref, pre),
-        title,
-        f"bias_{method}_image_{period.str('_')}",
-    ).clear()
-    plot_error_histogram(
-        Bias().err(ref, pre),
-        title,
-        f"err_{method}_hist_{period.str('_')}",
-    ).clear()
-    plot_relative_error_histogram(
-        Bias().rer(ref, pre, condition=ref > 1.0),
-        title,
-        f"rer_{method}_hist_{period.str('_')}",
-    ).clear()
-    plot_count_scene(
-        Count().image(ref, pre),
-        title,
-        f"count_{method}_image_{period.str('_')}",
-    ).clear()
+
+def det_coefficient_tasks(
+    ref: DataArray, pre: DataArray
+) -> dict[str, DataArray]:
+    return {
+        "det_value": R2().total(ref, pre),
+        "det_series": R2().series(ref, pre),
+        "det_image": R2().image(ref, pre),
+    }
 
 
 def plot_det_coefficient_diagrams(
-    ref: DataArray, pre: DataArray, method: str, period: Period
-):
-    ref = period.slice(ref)
-    pre = period.slice(pre)
+    results: dict[str, DataArray], method: str, period: Period
+) -> list[str]:
+    value = results["det_value"].item()
+    lines = [f"Coefficient of det. ({method}) {period}: {value:6.2f}"]
 
-    value = R2().value(ref, pre)
-    print(
-        f"Coefficient of det. ({method}) {period}: {value:6.2f}",
-        flush=True,
+    title = f"{method} forecast {period}"
+    clear(
+        plot_determination_coefficient_time_series(
+            results["det_series"],
+            title,
+            f"det_{method}_series_{period.str('_')}",
+            xlim=period.lim,
+        )
+    )
+    clear(
+        plot_determination_coefficient_scene(
+            results["det_image"],
+            title,
+            f"det_{method}_image_{period.str('_')}",
+        )
     )
+    return lines
 
-    title = f"{method} forecast {period}"
-    plot_determination_coefficient_time_series(
-        R2().series(ref, pre),
-        title,
-        f"det_{method}_series_{period.str('_')}",
-        xlim=period.lim,
-    ).clear()
-    plot_determination_coefficient_scene(
-        R2().image(ref, pre),
-        title,
-        f"det_{method}_image_{period.str('_')}",
-    ).clear()
+
+def mad_tasks(ref: DataArray, pre: DataArray) -> dict[str, DataArray]:
+    return {
+        "mad_value": MAD().total(ref, pre),
+        "mad_series": MAD().series(ref, pre),
+        "mad_image": MAD().image(ref, pre),
+    }
 
 
 def plot_mad_diagrams(
-    ref: DataArray, pre: DataArray, method: str, period: Period
-):
-    ref = period.slice(ref)
-    pre = period.slice(pre)
+    results: dict[str, DataArray], method: str, period: Period
+) -> list[str]:
+    value = results["mad_value"].item()
+    lines = [f"MAD ............... ({method}) {period}: {value:6.2f}"]
 
-    value = MAD().value(ref, pre)
-    print(
-        f"MAD ............... ({method}) {period}: {value:6.2f}",
-        flush=True,
+    title = f"{method} forecast {period}"
+    clear(
+        plot_mad_time_series(
+            results["mad_series"],
+            title,
+            f"mad_{method}_series_{period.str('_')}",
+            xlim=period.lim,
+        )
+    )
+    clear(
+        plot_mad_scene(
+            results["mad_image"],
+            title,
+            f"mad_{method}_image_{period.str('_')}",
+        )
     )
+    return lines
 
-    title = f"{method} forecast {period}"
-    plot_mad_time_series(
-        MAD().series(ref, pre),
-        title,
-        f"mad_{method}_series_{period.str('_')}",
-        xlim=period.lim,
-    ).clear()
-    plot_mad_scene(
-        MAD().image(ref, pre),
-        title,
-        f"mad_{method}_image_{period.str('_')}",
-    ).clear()
+
+def mapd_tasks(
+    ref: DataArray, pre: DataArray, condition: DataArray
+) -> dict[str, DataArray]:
+    return {
+        "mapd_value": MAPD().total(ref, pre, condition=condition),
+        "mapd_series": MAPD().series(ref, pre, condition=condition),
+        "mapd_image": MAPD().image(ref, pre, condition=condition),
+    }
 
 
 def plot_mapd_diagrams(
-    ref: DataArray, pre: DataArray, method: str, period: Period
-):
-    ref = period.slice(ref)
-    pre = period.slice(pre)
+    results: dict[str, DataArray], method: str, period: Period
+) -> list[str]:
+    value = results["mapd_value"].item()
+    lines = [f"MAPD .............. ({method}) {period}: {value:6.2f}"]
 
-    value = MAPD().value(ref, pre, condition=ref > 1.0)
-    print(
-        f"MAPD .............. ({method}) {period}: {value:6.2f}",
-        flush=True,
+    title = f"{method} forecast {period}"
+    clear(
+        plot_mapd_time_series(
+            results["mapd_series"],
+            title,
+            f"mapd_{method}_series_{period.str('_')}",
+            xlim=period.lim,
+        )
+    )
+    clear(
+        plot_mapd_scene(
+            results["mapd_image"],
+            title,
+            f"mapd_{method}_image_{period.str('_')}",
+        )
     )
+    return lines
 
-    title = f"{method} forecast {period}"
-    plot_mapd_time_series(
-        MAPD().series(ref, pre, condition=ref > 1.0),
-        title,
-        f"mapd_{method}_series_{period.str('_')}",
-        xlim=period.lim,
-    ).clear()
-    plot_mapd_scene(
-        MAPD().image(ref, pre, condition=ref > 1.0),
-        title,
-        f"mapd_{method}_image_{period.str('_')}",
-    ).clear()
+
+def rmse_tasks(ref: DataArray, pre: DataArray) -> dict[str, DataArray]:
+    return {
+        "rmse_value": RMSE().total(ref, pre),
+        "rmse_series": RMSE().series(ref, pre),
+        "rmse_image": RMSE().image(ref, pre),
+    }
 
 
 def plot_rmse_diagrams(
-    ref: DataArray, pre: DataArray, method: str, period: Period
-):
-    ref = period.slice(ref)
-    pre = period.slice(pre)
+    results: dict[str, DataArray], method: str, period: Period
+) -> list[str]:
+    value = results["rmse_value"].item()
+    lines = [f"RMSE .............. ({method}) {period}: {value:6.2f}"]
 
-    value = RMSE().value(ref, pre)
-    print(
-        f"RMSE .............. ({method}) {period}: {value:6.2f}",
-        flush=True,
+    title = f"{method} forecast {period}"
+    clear(
+        plot_rmse_time_series(
+            results["rmse_series"],
+            title,
+            f"rmse_{method}_series_{period.str('_')}",
+            xlim=period.lim,
+        )
+    )
+    clear(
+        plot_rmse_scene(
+            results["rmse_image"],
+            title,
+            f"rmse_{method}_image_{period.str('_')}",
+        )
     )
+    return lines
 
-    title = f"{method} forecast {period}"
-    plot_rmse_time_series(
-        RMSE().series(ref, pre),
-        title,
-        f"rmse_{method}_series_{period.str('_')}",
-        xlim=period.lim,
-    ).clear()
-    plot_rmse_scene(
-        RMSE().image(ref, pre),
-        title,
-        f"rmse_{method}_image_{period.str('_')}",
-    ).clear()
 
+def wrmsse_tasks(
+    ref: DataArray, pre: DataArray, condition: DataArray
+) -> dict[str, DataArray]:
+    return {
+        "wrmsse_value": WRMSSE().total(ref, pre, condition=condition),
+        "wrmsse_series": WRMSSE().series(ref, pre, condition=condition),
+        "wrmsse_image": WRMSSE().image(ref, pre, condition=condition),
+    }
 
-def plot_wrmsse_diagrams(
-    ref: DataArray, pre: DataArray, method: str, period: Period
-):
-    ref = period.slice(ref)
-    pre = period.slice(pre)
 
-    value = WRMSSE().value(ref, pre, condition=ref > 1.0)
-    print(
-        f"WRMSSE ............ ({method}) {period}: {value:6.2f}",
-        flush=True,
-    )
+def plot_wrmsse_diagrams(
+    results: dict[str, DataArray], method: str, period: Period
+) -> list[str]:
+    value = results["wrmsse_value"].item()
+    lines = [f"WRMSSE ............ ({method}) {period}: {value:6.2f}"]
 
     title = f"{method} forecast {period}"
-    plot_wrmsse_time_series(
-        WRMSSE().series(ref, pre, condition=ref > 1.0),
-        title,
-        f"wrmsse_{method}_series_{period.str('_')}",
-        xlim=period.lim,
-    ).clear()
-    plot_wrmsse_scene(
-        WRMSSE().image(ref, pre, condition=ref > 1.0),
-        title,
-        f"wrmsse_{method}_image_{period.str('_')}",
-    ).clear()
+    clear(
+        plot_wrmsse_time_series(
+            results["wrmsse_series"],
+            title,
+            f"wrmsse_{method}_series_{period.str('_')}",
+            xlim=period.lim,
+        )
+    )
+    clear(
+        plot_wrmsse_scene(
+            results["wrmsse_image"],
+            title,
+            f"wrmsse_{method}_image_{period.str('_')}",
+        )
+    )
+    return lines
 
 
 def plot_density_diagrams(
-    ref: DataArray, pre: DataArray, method: str, period: Period
+    x: DataArray, y: DataArray, method: str, period: Period, seed: int
 ):
-    x = period.slice(ref)
-    y = period.slice(pre)
-
-    plot_value_density(
-        (x, y),
-        f"{method} forecast {period}",
-        f"val_{method}_density_{period.str('_')}",
-    ).clear()
-    plot_error_density(
-        (x, y - x),
-        f"{method} forecast {period}",
-        f"err_{method}_density_{period.str('_')}",
-    ).clear()
-    plot_relative_error_density(
-        (x, (y - x) / x),
-        f"{method} forecast {period}",
-        f"rer_{method}_density_{period.str('_')}",
-    ).clear()
-    plot_value_scatter(
-        (x, y),
-        f"{method} forecast {period}",
-        f"val_{method}_scatter_{period.str('_')}",
-    ).clear()
-    plot_error_scatter(
-        (x, y - x),
-        f"{method} forecast {period}",
-        f"err_{method}_scatter_{period.str('_')}",
-    ).clear()
-    plot_relative_error_scatter(
-        (x, (y - x) / x),
-        f"{method} forecast {period}",
-        f"rer_{method}_scatter_{period.str('_')}",
-    ).clear()
-
-
-def plot_diagnostic_diagrams(ref: DataArray, pre: DataArray, method: str):
-    plot_bias_diagrams(ref, pre, method, Period(2016, 2019))
-    plot_bias_diagrams(ref, pre, method, Period(2020))
-
-    plot_det_coefficient_diagrams(ref, pre, method, Period(2016, 2019))
-    plot_det_coefficient_diagrams(ref, pre, method, Period(2020))
-
-    plot_mad_diagrams(ref, pre, method, Period(2016, 2019))
-    plot_mad_diagrams(ref, pre, method, Period(2020))
-
-    plot_mapd_diagrams(ref, pre, method, Period(2016, 2019))
-    plot_mapd_diagrams(ref, pre, method, Period(2020))
-
-    plot_rmse_diagrams(ref, pre, method, Period(2016, 2019))
-    plot_rmse_diagrams(ref, pre, method, Period(2020))
-
-    plot_wrmsse_diagrams(ref, pre, method, Period(2016, 2019))
-    plot_wrmsse_diagrams(ref, pre, method, Period(2020))
-
-    plot_density_diagrams(ref, pre, method, Period(2016, 2019))
-    plot_density_diagrams(ref, pre, method, Period(2020))
-
-
-def generate_figures(args):
-    da.random.seed(42)
-
-    reader = ReaderFactory.create_reader(args.aws)
-    cube = reader.read(args.cube_id, depth_level=3.0)
+    # the errors are shared by density and scatter diagrams
+    err, rer = dask.persist(y - x, (y - x) / x)
+    clear(
+        plot_value_density(
+            (x, y),
+            f"{method} forecast {period}",
+            f"val_{method}_density_{period.str('_')}",
+        )
+    )
+    clear(
+        plot_error_density(
+            (x, err),
+            f"{method} forecast {period}",
+            f"err_{method}_density_{period.str('_')}",
+        )
+    )
+    clear(
+        plot_relative_error_density(
+            (x, rer),
+            f"{method} forecast {period}",
+            f"rer_{method}_density_{period.str('_')}",
+        )
+    )
+    clear(
+        plot_value_scatter(
+            (x, y),
+            f"{method} forecast {period}",
+            f"val_{method}_scatter_{period.str('_')}",
+            seed=seed,
+        )
+    )
+    clear(
+        plot_error_scatter(
+            (x, err),
+            f"{method} forecast {period}",
+            f"err_{method}_scatter_{period.str('_')}",
+            seed=seed,
+        )
+    )
+    clear(
+        plot_relative_error_scatter(
+            (x, rer),
+            f"{method} forecast {period}",
+            f"rer_{method}_scatter_{period.str('_')}",
+            seed=seed,
+        )
+    )
 
-    for h in [7, 6, 5, 4, 3, 2, 1]:
-        ref, xgb = XGB(args).predict(cube, min_pixels=_MIN_PIXELS, h=h)
-        plot_diagnostic_diagrams(ref, xgb, f"XGB{h}")
 
-    ref, pre = BGC(args).predict(cube, min_pixels=_MIN_PIXELS)
-    plot_diagnostic_diagrams(ref, pre, "BGC")
-    plot_diagnostic_diagrams(ref, xgb.where(pre.notnull()), "XGB1:BGC")
+def plot_diagnostic_diagrams(
+    ref: DataArray, pre: DataArray, method: str
+) -> list[str]:
+    # the periods are disjoint, so their diagrams are plotted concurrently,
+    # the metrics are returned metric by metric, in the order of periods
+    periods = (Period(2016, 2019), Period(2020))
+    with ThreadPoolExecutor(max_workers=len(periods)) as executor:
+        results = list(
+            executor.map(
+                lambda period: plot_period_diagrams(ref, pre, method, period),
+                periods,
+            )
+        )
+    return [
+        line
+        for metric in zip(*results)
+        for lines in metric
+        for line in lines
+    ]
+
+
+def plot_period_diagrams(
+    ref: DataArray, pre: DataArray, method: str, period: Period
+) -> list[list[str]]:
+    # slice once and keep the slices in memory for all diagrams
+    ref_p, pre_p = dask.persist(period.slice(ref), period.slice(pre))
+    # the condition for relative metrics is shared, too
+    (cond,) = dask.persist(ref_p > 1.0)
+    # compute all metrics at once, to evaluate shared tasks only once
+    (results,) = dask.compute(
+        {
+            **bias_tasks(ref_p, pre_p),
+            **det_coefficient_tasks(ref_p, pre_p),
+            **mad_tasks(ref_p, pre_p),
+            **mapd_tasks(ref_p, pre_p, cond),
+            **rmse_tasks(ref_p, pre_p),
+            **wrmsse_tasks(ref_p, pre_p, cond),
+        },
+        scheduler="threads",
+    )
 
-    ref, pre = Naive().predict(cube[VID_CHL], min_pixels=_MIN_PIXELS)
-    plot_diagnostic_diagrams(ref, pre, "Naive")
-    plot_diagnostic_diagrams(ref, xgb.where(pre.notnull()), "XGB1:Naive")
+    lines = [
+        plot_bias_diagrams(results, ref_p, pre_p, cond, method, period),
+        plot_det_coefficient_diagrams(results, method, period),
+        plot_mad_diagrams(results, method, period),
+        plot_mapd_diagrams(results, method, period),
+        plot_rmse_diagrams(results, method, period),
+        plot_wrmsse_diagrams(results, method, period),
+    ]
+    # scatter samples are drawn from a random state of the method and
+    # period, to be reproducible when drawn concurrently
+    seed = zlib.crc32(f"{method} {period}".encode())
+    plot_density_diagrams(ref_p, pre_p, method, period, seed)
+    return lines
+
+
+def plot_benchmark_diagrams(
+    predict: Callable, xgb: DataArray, name: str
+) -> list[str]:
+    # the forecast is persisted to be computed only once for the diagrams
+    # of this benchmark, the memory is released when the job is done
+    ref, pre = dask.persist(*predict(min_pixels=_MIN_PIXELS))
+    return [
+        *plot_diagnostic_diagrams(ref, pre, name),
+        *plot_diagnostic_diagrams(
+            ref, xgb.where(pre.notnull()), f"XGB1:{name}"
+        ),
+    ]
+
+
+def print_lines(lines: list[str]):
+    for line in lines:
+        print(line, flush=True)
 
-    ref, pre = SNaive().predict(cube[VID_CHL], min_pixels=_MIN_PIXELS)
-    plot_diagnostic_diagrams(ref, pre, "sNaive")
-    plot_diagnostic_diagrams(ref, xgb.where(pre.notnull()), "XGB1:sNaive")
 
-    ref, pre = MA().predict(cube[VID_CHL], min_pixels=_MIN_PIXELS)
-    plot_diagnostic_diagrams(ref, pre, "MA")
-    plot_diagnostic_diagrams(ref, xgb.where(pre.notnull()), "XGB1:MA")
+def generate_figures(args):
+    reader = ReaderFactory.create_reader(args.aws)
+    cube = reader.read(args.cube_id, depth_level=3.0)
 
-    ref, pre = SES().predict(cube[VID_CHL], min_pixels=_MIN_PIXELS)
-    plot_diagnostic_diagrams(ref, pre, "SES")
-    plot_diagnostic_diagrams(ref, xgb.where(pre.notnull()), "XGB1:SES")
+    # forecasts are persisted to be computed only once for all diagrams,
+    # the memory is released when the names are bound to the next ones
+    forecasts = XGB(args).predict_horizons(
+        cube, min_pixels=_MIN_PIXELS, horizons=[7, 6, 5, 4, 3, 2, 1]
+    )
+    for h, (ref, xgb) in forecasts.items():
+        ref, xgb = dask.persist(ref, xgb)
+        print_lines(plot_diagnostic_diagrams(ref, xgb, f"XGB{h}"))
+
+    chl = cube[VID_CHL]
+    predictions = {
+        "BGC": partial(BGC(args).predict, cube),
+        "Naive": partial(Naive().predict, chl),
+        "sNaive": partial(SNaive().predict, chl),
+        "MA": partial(MA().predict, chl),
+        "SES": partial(SES().predict, chl),
+    }
+    # the benchmarks are independent, so a few of them are validated
+    # concurrently, the metrics are printed in the order of the benchmarks
+    # when all benchmarks are done
+    with ThreadPoolExecutor(max_workers=_MAX_JOBS) as executor:
+        results = list(
+            executor.map(
+                lambda name: plot_benchmark_diagrams(
+                    predictions[name], xgb, name
+                ),
+                predictions,
+            )
+        )
+    for lines in results:
+        print_lines(lines)
+    flush()
 
 
 if __name__ == "__main__":
-    parser = ArgumentParser(
-        prog="wqf-pvr",
-        description="This command produces figures for the Product "
+    parser = create_parser(
+        "wqf-pvr",
+        "This command produces figures for the Product "
         "Validation Report (PVR).",
-        epilog="Copyright (c) Brockmann Consult GmbH, 2024. License: MIT",
-        exit_on_error=True,
-        formatter_class=ArgumentDefaultsHelpFormatter,
     )
-    parser.add_argument("cube_id", help="the data cube identifier")
     parser.add_argument("bgcm_id", help="the BGCM data identifier")
     parser.add_argument("xgbm_id", help="the XGBM data identifier")
-    parser.add_argument(
-        "--aws",
-        help="read from AWS team store",
-        action="store_true",
-        default=False,
-        required=False,
-        dest="aws",
-    )
     generate_figures(parser.parse_args())
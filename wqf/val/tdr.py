@@ -5,25 +5,45 @@
 This module produces plots for the Test (Site) Data Report (TDR).
 """
 import warnings
-from argparse import ArgumentDefaultsHelpFormatter
-from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
 
+import dask
+import matplotlib
 import numpy as np
 import xarray as xr
 from matplotlib import colors as plc
+from xarray import DataArray
 
 from wqf.interface.constants import DID_LAT
 from wqf.interface.constants import DID_LON
 from wqf.interface.constants import DID_TIM
 from wqf.readerfactory import ReaderFactory
+from wqf.val.cli import create_parser
 from wqf.val.plots import DensityPlot
 from wqf.val.plots import HistogramPlot
 from wqf.val.plots import ScenePlot
+from wqf.val.plots import flush
 
 warnings.filterwarnings(
     "ignore",
 )
 
+matplotlib.use("Agg")
+
+# plots are stateless and shared by all figures
+_DENSITY = DensityPlot()
+_HIST = HistogramPlot()
+_SCENE = ScenePlot()
+
+_BINS = (50, 50)
+"""The number of bins used for plotting densities."""
+
+_CHL_LABEL = r"chlorophyll concentration (mg m$^{-3}$)"
+"""The axis and colorbar label of chlorophyll concentration."""
+
+_XLOCS = (1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0)
+"""The longitude grid line locations used for plotting scenes."""
+
 
 def chlorophyll_quantiles():
     """
@@ -31,23 +51,23 @@ def chlorophyll_quantiles():
     concentration in open waters, which could be artifacts of
     undetected clouds.
     """
-    ScenePlot().plot(
+    _SCENE.plot(
         chl_q_lo,
         title="quantile q = 0.005",
         fn="fig01",
-        cbar_label=r"chlorophyll concentration (mg m$^{-3}$)",
+        cbar_label=_CHL_LABEL,
         norm=plc.LogNorm(),
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
         vmin=1.0,
         vmax=100.0,
     ).clear()
-    ScenePlot().plot(
+    _SCENE.plot(
         chl_q_hi,
         title="quantile q = 0.995",
         fn="fig02",
-        cbar_label=r"chlorophyll concentration (mg m$^{-3}$)",
+        cbar_label=_CHL_LABEL,
         norm=plc.LogNorm(),
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
         vmin=1.0,
         vmax=100.0,
     ).clear()
@@ -62,41 +82,41 @@ def chlorophyll_mean_and_std():
     rid of cloud contamination, if we excluded the upper percentile of
     chlorophyll concentration values.
     """
-    ScenePlot().plot(
-        cube.chl.mean(DID_TIM),
+    _SCENE.plot(
+        chl_mean,
         title="mean",
-        cbar_label=r"chlorophyll concentration (mg m$^{-3}$)",
+        cbar_label=_CHL_LABEL,
         norm=plc.LogNorm(),
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
         vmin=1.0,
         vmax=100.0,
     ).clear()
-    ScenePlot().plot(
-        cube.chl.std(DID_TIM),
+    _SCENE.plot(
+        chl_std,
         title="standard deviation",
-        cbar_label=r"chlorophyll concentration (mg m$^{-3}$)",
+        cbar_label=_CHL_LABEL,
         norm=plc.LogNorm(),
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
         vmin=1.0,
         vmax=100.0,
     ).clear()
-    ScenePlot().plot(
-        xr.where(cube.chl < chl_q_hi, cube.chl, np.nan).mean(DID_TIM),
+    _SCENE.plot(
+        chl_clipped_mean,
         title="mean",
         fn="fig03",
-        cbar_label=r"chlorophyll concentration (mg m$^{-3}$)",
+        cbar_label=_CHL_LABEL,
         norm=plc.LogNorm(),
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
         vmin=1.0,
         vmax=100.0,
     ).clear()
-    ScenePlot().plot(
-        xr.where(cube.chl < chl_q_hi, cube.chl, np.nan).std(DID_TIM),
+    _SCENE.plot(
+        chl_clipped_std,
         title="standard deviation",
         fn="fig04",
-        cbar_label=r"chlorophyll concentration (mg m$^{-3}$)",
+        cbar_label=_CHL_LABEL,
         norm=plc.LogNorm(),
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
         vmin=1.0,
         vmax=100.0,
     ).clear()
@@ -109,7 +129,7 @@ def chlorophyll_variability():
 
     The figure considers coastal waters only, which are our main interest.
     """
-    DensityPlot().plot(
+    _DENSITY.plot(
         (
             cube.doy,
             xr.where(cube.deptho < 30.0, cube.chl, np.nan).mean(
@@ -117,10 +137,10 @@ def chlorophyll_variability():
             ),
         ),
         xlabel="day of year",
-        ylabel=r"chlorophyll concentration (mg m$^{-3}$)",
+        ylabel=_CHL_LABEL,
         title="mean CHL vs day of year",
         fn="fig05",
-        bins=(50, 50),
+        bins=_BINS,
         cbar_label="number count",
         density=False,
         hist_range=((40, 310), (0.0, 10)),
@@ -149,21 +169,18 @@ def number_of_chlorophyll_observations_from_space():
     chlorophyll concentration can be well described by an exponential
     distribution with a mean value of about 1.0 mg m-3.
     """
-    chl_count = cube.chl.count(dim="time") / cube.chl.shape[0]
-    chl_count = xr.where(chl_count == 0, np.nan, 1.0 * chl_count)
-
-    ScenePlot().plot(
-        chl_count,
+    _SCENE.plot(
+        chl_obs,
         title="number of observations",
         fn="fig06",
         cbar_label=r"number of observations (day$^{-1}$)",
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
         vmin=0.1,
         vmax=0.5,
     ).clear()
-    HistogramPlot().plot(
+    _HIST.plot(
         cube.chl,
-        xlabel=r"chlorophyll concentration (mg m$^{-3}$)",
+        xlabel=_CHL_LABEL,
         ylabel="number count",
         ylim=(100, 100000000),
         title="number distribution",
@@ -189,32 +206,32 @@ def depth_of_sea_floor():
     too. Seasonal effects and spontaneous events concern shallow water
     mainly.
     """
-    ScenePlot().plot(
+    _SCENE.plot(
         cube.deptho,
         title="sea floor depth",
         fn="fig08",
         cbar_label="depth (m)",
-        xlocs=(1.0, 2.5, 4.0, 5.5, 7.0, 8.5, 10.0),
+        xlocs=_XLOCS,
     ).clear()
-    DensityPlot().plot(
-        (cube.deptho, cube.chl.mean(DID_TIM)),
+    _DENSITY.plot(
+        (cube.deptho, chl_mean),
         xlabel="depth (m)",
-        ylabel=r"chlorophyll concentration (mg m$^{-3}$)",
+        ylabel=_CHL_LABEL,
         title="mean CHL vs sea floor depth",
         fn="fig09",
-        bins=(50, 50),
+        bins=_BINS,
         cbar_label="number count",
         density=False,
         hist_range=((0.0, 50.0), (0.0, 50.0)),
         norm=plc.SymLogNorm(1.0, vmin=0.0, vmax=2000.0),
     ).clear()
-    DensityPlot().plot(
-        (cube.deptho, cube.chl.std(DID_TIM)),
+    _DENSITY.plot(
+        (cube.deptho, chl_std),
         xlabel="depth (m)",
-        ylabel=r"chlorophyll concentration (mg m$^{-3}$)",
+        ylabel=_CHL_LABEL,
         title="standard deviation CHL vs sea floor depth",
         fn="fig10",
-        bins=(50, 50),
+        bins=_BINS,
         cbar_label="number count",
         density=False,
         hist_range=((0.0, 50.0), (0.0, 50.0)),
@@ -232,73 +249,75 @@ def examples_of_statistical_correlations():
     rely on this analysis instead of investigating every possible
     correlation separately.
     """
-    DensityPlot().plot(
-        (cube.mdt, cube.chl.mean(DID_TIM)),
+    sst_mean, sst_std = dask.persist(*mean_std(cube.sst, DID_TIM))
+
+    _DENSITY.plot(
+        (cube.mdt, chl_mean),
         xlabel="mean dynamic topography (m)",
-        ylabel=r"chlorophyll concentration (mg m$^{-3}$)",
+        ylabel=_CHL_LABEL,
         title="mean CHL vs mean dynamic topography",
         fn="fig11",
-        bins=(50, 50),
+        bins=_BINS,
         cbar_label="number count",
         density=False,
         hist_range=((-0.53, -0.27), (0.0, 50.0)),
         norm=plc.SymLogNorm(1.0, vmin=0.0, vmax=2000.0),
     ).clear()
-    DensityPlot().plot(
-        (cube.sst.mean(DID_TIM), cube.chl.mean(DID_TIM)),
+    _DENSITY.plot(
+        (sst_mean, chl_mean),
         xlabel="sea surface temperature (K)",
-        ylabel=r"chlorophyll concentration (mg m$^{-3}$)",
+        ylabel=_CHL_LABEL,
         title="mean CHL vs mean SST",
         fn="fig12",
-        bins=(50, 50),
+        bins=_BINS,
         cbar_label="number count",
         density=False,
         hist_range=((284.0, 289.0), (0.0, 50.0)),
         norm=plc.SymLogNorm(1.0, vmin=0.0, vmax=2000.0),
     ).clear()
-    DensityPlot().plot(
-        (cube.sst.std(DID_TIM), cube.chl.mean(DID_TIM)),
+    _DENSITY.plot(
+        (sst_std, chl_mean),
         xlabel="sea surface temperature (K)",
-        ylabel=r"chlorophyll concentration (mg m$^{-3}$)",
+        ylabel=_CHL_LABEL,
         title="mean CHL vs standard deviation SST",
         fn="fig13",
-        bins=(50, 50),
+        bins=_BINS,
         cbar_label="number count",
         density=False,
         hist_range=((2.0, 7.0), (0.0, 50.0)),
         norm=plc.SymLogNorm(1.0, vmin=0.0, vmax=2000.0),
     ).clear()
-    DensityPlot().plot(
-        (cube.so.mean(DID_TIM), cube.chl.mean(DID_TIM)),
+    _DENSITY.plot(
+        (cube.so.mean(DID_TIM), chl_mean),
         xlabel="surface salinity (10-3)",
-        ylabel=r"chlorophyll concentration (mg m$^{-3}$)",
+        ylabel=_CHL_LABEL,
         title="mean CHL vs mean surface salinity",
         fn="fig14",
-        bins=(50, 50),
+        bins=_BINS,
         cbar_label="number count",
         density=False,
         hist_range=((0.0, 50.0), (0.0, 50.0)),
         norm=plc.SymLogNorm(1.0, vmin=0.0, vmax=2000.0),
     ).clear()
-    DensityPlot().plot(
-        (cube.mlotst.mean(DID_TIM), cube.chl.mean(DID_TIM)),
+    _DENSITY.plot(
+        (cube.mlotst.mean(DID_TIM), chl_mean),
         xlabel="mixed layer thickness (m)",
-        ylabel=r"chlorophyll concentration (mg m$^{-3}$)",
+        ylabel=_CHL_LABEL,
         title="mean CHL vs mean mixed layer thickness",
         fn="fig15",
-        bins=(50, 50),
+        bins=_BINS,
         cbar_label="number count",
         density=False,
         hist_range=((0.0, 50.0), (0.0, 50.0)),
         norm=plc.SymLogNorm(1.0, vmin=0.0, vmax=2000.0),
     ).clear()
-    DensityPlot().plot(
+    _DENSITY.plot(
         (cube.mlotst.mean(DID_TIM), cube.deptho),
         xlabel="sea floor depth (m)",
         ylabel="mixed layer thickness (m)",
         title="mean mixed layer thickness vs sea floor depth",
         fn="fig16",
-        bins=(50, 50),
+        bins=_BINS,
         cbar_label="number count",
         density=False,
         hist_range=((0.0, 200.0), (0.0, 50.0)),
@@ -306,39 +325,109 @@ def examples_of_statistical_correlations():
     ).clear()
 
 
-if __name__ == "__main__":
-    parser = ArgumentParser(
-        prog="wqf-tdr",
-        description="This command produces figures for the Test (Site) Data "
-        "Report (TDR).",
-        epilog="Copyright (c) Brockmann Consult GmbH, 2024. License: MIT",
-        exit_on_error=True,
-        formatter_class=ArgumentDefaultsHelpFormatter,
-    )
-    parser.add_argument("cube_id", help="the data cube identifier")
-    parser.add_argument(
-        "--aws",
-        help="read from AWS team store",
-        action="store_true",
-        default=False,
-        required=False,
-        dest="aws",
+def quantiles(
+    a: DataArray, q: tuple[float, ...], dim: str
+) -> tuple[DataArray, ...]:
+    """
+    Returns quantiles of a data array along a dimension, ignoring missing
+    values.
+
+    :param a: The data array.
+    :param q: The probabilities of the quantiles.
+    :param dim: The dimension.
+    :return: The quantiles, one for each probability.
+    """
+    qa = xr.apply_ufunc(
+        _nanquantile,
+        a.chunk({dim: -1}),
+        input_core_dims=[[dim]],
+        output_core_dims=[["quantile"]],
+        kwargs={"q": q},
+        dask="parallelized",
+        dask_gufunc_kwargs={"output_sizes": {"quantile": len(q)}},
+        output_dtypes=[a.dtype],
     )
+    return tuple(qa.isel(quantile=i) for i in range(len(q)))
 
-    args = parser.parse_args()
-    reader = ReaderFactory.create_reader(args.aws)
-    cube = reader.read(args.cube_id, depth_level=3.0, unify=False)
-    chl_q_lo = cube.chl.quantile(0.005, dim=DID_TIM).compute()
-    chl_q_hi = cube.chl.quantile(0.995, dim=DID_TIM).compute()
 
-    chlorophyll_quantiles()
+def _nanquantile(a: np.ndarray, q: tuple[float, ...]) -> np.ndarray:
+    """
+    Returns quantiles of data along the last axis, ignoring missing values.
 
-    chlorophyll_mean_and_std()
+    Unlike `np.nanquantile`, which loops over all one-dimensional slices
+    of data with missing values, the computation is vectorized. Missing
+    values are sorted last, and the quantiles are linearly interpolated
+    between the sorted values, like by `np.nanquantile`.
+    """
+    a = np.sort(a, axis=-1)
+    n = np.count_nonzero(~np.isnan(a), axis=-1)[..., np.newaxis]
+    k = np.maximum(n - 1, 0)
+    pos = np.asarray(q) * k
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, k)
+    a_lo = np.take_along_axis(a, lo, axis=-1)
+    a_hi = np.take_along_axis(a, hi, axis=-1)
+    return (a_lo + (pos - lo) * (a_hi - a_lo)).astype(a.dtype)
+
+
+def mean_std(a: DataArray, dim: str) -> tuple[DataArray, DataArray]:
+    """
+    Returns the mean and the standard deviation of a data array along a
+    dimension, ignoring missing values.
 
-    chlorophyll_variability()
+    Both are reduced block by block in double precision, without
+    rechunking the dimension. When computed together, the data are read
+    only once for both.
+
+    :param a: The data array.
+    :param dim: The dimension.
+    :return: The mean and the standard deviation.
+    """
+    a64 = a.astype(np.float64)
+    return a64.mean(dim).astype(a.dtype), a64.std(dim).astype(a.dtype)
 
-    number_of_chlorophyll_observations_from_space()
 
-    depth_of_sea_floor()
+if __name__ == "__main__":
+    parser = create_parser(
+        "wqf-tdr",
+        "This command produces figures for the Test (Site) Data "
+        "Report (TDR).",
+    )
 
-    examples_of_statistical_correlations()
+    args = parser.parse_args()
+    # the chunks of the data on disk along latitude and longitude, but a
+    # single chunk along time, so reductions over time need no rechunking
+    reader = ReaderFactory.create_reader(
+        args.aws,
+        config={
+            "config.wqf.reader.chunks": {DID_TIM: -1, DID_LAT: 0, DID_LON: 0}
+        },
+    )
+    cube = reader.read(args.cube_id, depth_level=3.0, unify=False)
+    chl_q_lo, chl_q_hi = dask.compute(
+        *quantiles(cube.chl, (0.005, 0.995), DID_TIM)
+    )
+    # the reductions are shared by several figures and computed only once
+    chl_clipped = cube.chl.where(cube.chl < chl_q_hi)
+    chl_count = cube.chl.count(DID_TIM)
+    chl_reductions = dask.persist(
+        chl_count.where(chl_count > 0) / cube.chl.shape[0],
+        *mean_std(cube.chl, DID_TIM),
+        *mean_std(chl_clipped, DID_TIM),
+    )
+    chl_obs, chl_mean, chl_std, chl_clipped_mean, chl_clipped_std = (
+        chl_reductions
+    )
+
+    # the figures are independent and plotted concurrently
+    figures = (
+        chlorophyll_quantiles,
+        chlorophyll_mean_and_std,
+        chlorophyll_variability,
+        number_of_chlorophyll_observations_from_space,
+        depth_of_sea_floor,
+        examples_of_statistical_correlations,
+    )
+    with ThreadPoolExecutor(max_workers=len(figures)) as executor:
+        list(executor.map(lambda plot: plot(), figures))
+    flush()
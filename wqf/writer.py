@@ -10,13 +10,17 @@ from pathlib import Path
 from typing import Any
 from typing import Literal
 
+import dask
 import numpy as np
+import zarr
 from dask.array import Array
+from numcodecs import Blosc
 from typing_extensions import override
 from xarray import DataArray
 from xarray import Dataset
 
 from .interface.writing import Writing
+from .logger import get_logger
 from .progress import Progress
 
 _KEY_CHUNKS: str = "config.wqf.writer.chunks"
@@ -47,6 +51,17 @@ _KEY_SHUFFLE: str = "config.wqf.writer.shuffle"
 The key to configure shuffling. The default is `true`.
 """
 
+_ZARR_V3: bool = int(zarr.__version__.split(".")[0]) >= 3
+"""Whether Zarr datasets are written using Zarr version 3."""
+
+_KEY_COMPRESSOR: str = "config.wqf.writer.compressor"
+"""
+The key to configure the Blosc compressor used for writing Zarr datasets,
+e.g., `lz4`, `zlib`, or `zstd`. The default is `zstd`. The compression
+level and shuffling are configured by the respective keys. Data written
+to netCDF are compressed using zlib.
+"""
+
 
 class Writer(Writing):
     """! The target dataset writer."""
@@ -57,12 +72,16 @@ class Writer(Writing):
     _progress: bool
     """Displays a progress bar on the console, if set."""
 
+    _scheduler: str | None
+    """The Dask scheduler used for writing Zarr datasets."""
+
     def __init__(
         self,
         config: dict[str, Any],
         chunks: dict[str:int] = None,
         engine: Literal["h5netcdf", "netcdf4", "zarr"] | None = None,
         progress: bool = False,
+        scheduler: Literal["threads", "processes"] | None = None,
     ):
         """
         Creates a new writer instance.
@@ -73,6 +92,10 @@ class Writer(Writing):
         :param engine: An explicit specification of the writer engine.
         Overrides the writer configuration.
         :param progress: Displays a progress bar on the console, if set.
+        :param scheduler: An explicit specification of the Dask scheduler
+        used for writing Zarr datasets. Overrides the global Dask
+        configuration. Writing netCDF ignores this parameter, because the
+        HDF5 library serializes all writes.
         """
         self._config = {
             _KEY_CHUNKS: {},
@@ -80,6 +103,7 @@ class Writer(Writing):
             _KEY_ZLIB: "true",
             _KEY_COMPLEVEL: 1,
             _KEY_SHUFFLE: "true",
+            _KEY_COMPRESSOR: "zstd",
         }
         self._config.update(config)
         if chunks is not None:
@@ -87,6 +111,7 @@ class Writer(Writing):
         if engine is not None:
             self._config[_KEY_ENGINE] = engine
         self._progress = progress
+        self._scheduler = scheduler
 
     @override
     def write(
@@ -96,13 +121,22 @@ class Writer(Writing):
         variables, encoding = self._encode(dataset, to_zarr)
         attrs = self._config.get("attrs", {})
         attrs.update(dataset.attrs)
-        attrs["uuid"] = self._uuid
+        attrs["uuid"] = f"{uuid.uuid4()}"  # one per dataset written
 
         with Dataset(variables, attrs=attrs) as ds:
             if to_zarr:
-                with Progress(self._progress):
-                    ds.to_zarr(data_id, encoding=encoding)
+                config = {}
+                if self._scheduler is not None:
+                    config["scheduler"] = self._scheduler
+                with dask.config.set(config):
+                    with Progress(self._progress):
+                        ds.to_zarr(data_id, encoding=encoding)
             else:
+                if self._scheduler is not None:
+                    get_logger().warning(
+                        f"ignoring scheduler '{self._scheduler}' for "
+                        "writing netCDF"
+                    )
                 with Progress(self._progress):
                     # noinspection PyTypeChecker
                     ds.to_netcdf(
@@ -114,48 +148,55 @@ class Writer(Writing):
 
     def _encode(self, dataset: Dataset, to_zarr: bool = True):
         """This method does not belong to public API."""
-        names: dict[str, str] = {}
-
-        for vid, config in self._config.items():
-            if vid not in dataset:
-                continue
-            names[vid] = self._get_name(config)
+        configs: dict[str, dict[str, Any]] = {
+            vid: config
+            for vid, config in self._config.items()
+            if vid in dataset
+        }
+        # all names must be known to resolve coordinate variables
+        names: dict[str, str] = {
+            vid: self._get_name(config) for vid, config in configs.items()
+        }
 
         variables: dict[str, DataArray] = {}
         encodings: dict[str, dict[str, Any]] = {}
 
-        for vid, config in self._config.items():
-            if vid not in dataset:
-                continue
-
+        for vid, config in configs.items():
             dtype = self._get_dtype(config)
             attrs = self._encode_attrs(self._get_attrs(config, names), dtype)
             array = dataset[vid].data
 
-            name = self._get_name(config)
+            name = names[vid]
             dims = self._get_dims(config)
             chunks: list[int] = []
             if name not in dims:  # not a coordinate dimension
-                for i, dim in enumerate(dims):
-                    if dim in self._chunks:
-                        chunk_size = self._chunks[dim]
-                        assert isinstance(chunk_size, int), (
-                            f"Invalid chunk size specified for "
-                            f"dimension '{dim}'"
-                        )
-                        if chunk_size == -1:
-                            chunk_size = array.shape[i]
-                        if chunk_size == 0:
-                            chunk_size = array.chunksize[i]
-                        chunks.append(chunk_size)
-                    else:
-                        chunks.append(array.chunksize[i])
+                chunksize = array.chunksize
+                chunks = [
+                    self._chunk_size(dim, array.shape[i], chunksize[i])
+                    for i, dim in enumerate(dims)
+                ]
+                # dask chunks must match the storage chunks to write each
+                # chunk once and without locking
+                if tuple(chunks) != chunksize:
+                    array = array.rechunk(chunks)
             encodings[name] = self._encode_compress(
                 dtype, attrs, chunks, to_zarr
             )
             variables[name] = self._encode_variable(name, dims, attrs, array)
         return variables, encodings
 
+    def _chunk_size(self, dim: str, size: int, chunk_size: int) -> int:
+        """This method does not belong to public API."""
+        configured = self._chunks.get(dim, 0)
+        assert isinstance(
+            configured, int
+        ), f"Invalid chunk size specified for dimension '{dim}'"
+        if configured == -1:
+            return size
+        if configured == 0:
+            return chunk_size
+        return configured
+
     def _auto_engine(self, path: str | Path) -> str:
         """This method does not belong to public API."""
         if f"{path}".endswith(".zarr"):
@@ -195,9 +236,9 @@ class Writer(Writing):
         return self._config[_KEY_SHUFFLE] == "true"
 
     @property
-    def _uuid(self) -> str:
+    def _compressor(self) -> str:
         """This method does not belong to public API."""
-        return f"{uuid.uuid4()}"
+        return self._config[_KEY_COMPRESSOR]
 
     @staticmethod
     def _get_attrs(config, names: dict[str:str]) -> dict[str, Any]:
@@ -248,9 +289,11 @@ class Writer(Writing):
             attrs[name] = Writer._convert(attrs[name], dtype)
 
     @staticmethod
-    def _convert(value, dtype: np.dtype) -> np.ndarray:
+    def _convert(value, dtype: np.dtype) -> np.ndarray | np.generic:
         """This method does not belong to public API."""
-        return np.array(value).astype(dtype).squeeze()
+        if np.isscalar(value):
+            return dtype.type(value)
+        return np.asarray(value, dtype=dtype).squeeze()
 
     @staticmethod
     def _encode_variable(
@@ -280,9 +323,29 @@ class Writer(Writing):
             else:
                 enc["chunksizes"] = tuple(chunks)
         if to_zarr:
-            pass
+            enc.update(self._encode_compressor())
         else:
             enc["zlib"] = self._zlib
             enc["complevel"] = self._complevel
             enc["shuffle"] = self._shuffle
         return enc
+
+    def _encode_compressor(self) -> dict[str, Any]:
+        """This method does not belong to public API."""
+        if _ZARR_V3:
+            from zarr.codecs import BloscCodec
+
+            shuffle = "bitshuffle" if self._shuffle else "noshuffle"
+            codec = BloscCodec(
+                cname=self._compressor,
+                clevel=self._complevel,
+                shuffle=shuffle,
+            )
+            return {"compressors": (codec,)}
+        shuffle = Blosc.BITSHUFFLE if self._shuffle else Blosc.NOSHUFFLE
+        codec = Blosc(
+            cname=self._compressor,
+            clevel=self._complevel,
+            shuffle=shuffle,
+        )
+        return {"compressor": codec}
@@ -8,13 +8,22 @@ file registry.
 
 from importlib import resources
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import yaml
-from xgboost import Booster
+
+if TYPE_CHECKING:
+    from xgboost import Booster
 
 __version__ = "2025.1.0"
 """The version of the forecast model registry."""
 
+_CONFIG = resources.files("wqf.xgb.config")
+"""The resource container of forecast model specification files."""
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+"""The YAML loader, which is backed by LibYAML, if available."""
+
 
 class Registry:
     """A simple registry for forcast model specification files."""
@@ -22,15 +31,23 @@ class Registry:
     _config: dict[str:str]
     """The mapping from model name to model specification file."""
 
+    _shared_config: dict[str:str] | None = None
+    """The configured models, parsed once for all registry instances."""
+
+    _models: dict[str, "Booster"]
+    """The models loaded so far, by model name."""
+
     def __init__(self):
         """
         Creates a new registry instance.
         """
-        with resources.path(
-            "wqf.xgb.config", "wqf.xgb.config.yml"
-        ) as resource:
-            with open(resource) as r:
-                self._config = yaml.safe_load(r).get("models", {})
+        if Registry._shared_config is None:
+            resource = _CONFIG.joinpath("wqf.xgb.config.yml")
+            with resource.open() as r:
+                config = yaml.load(r, Loader=_YAML_LOADER).get("models", {})
+            Registry._shared_config = config
+        self._config = Registry._shared_config
+        self._models = {}
 
     @property
     def default_name(self) -> str:
@@ -51,19 +68,24 @@ class Registry:
         :return: The path to the model specification file associated with
         the model name supplied as argument.
         """
-        with resources.path("wqf.xgb.config", self._config[name]) as resource:
-            return resource
+        return Path(_CONFIG.joinpath(self._config[name]))
 
-    def model(self, name: str) -> Booster:
+    def model(self, name: str) -> "Booster":
         """
         Returns the model associated with the model name supplied
         as argument.
 
         :param name: The model name.
         :return: The model associated with the model name supplied
-        as argument.
+        as argument. Models are loaded once and shared by all callers.
         """
-        return Booster(model_file=self.file(name))
+        from xgboost import Booster
+
+        model = self._models.get(name)
+        if model is None:
+            model = Booster(model_file=self.file(name))
+            self._models[name] = model
+        return model
 
     def __contains__(self, name: str) -> bool:
         return name in self._config
@@ -73,10 +95,13 @@ class Registry:
         return "{{{0}}}".format(str(self.names)[1:-2].replace("'", ""))
 
 
-_registry = Registry()
-"""The forecast model registry."""
+_registry: Registry | None = None
+"""The forecast model registry, which is created on first use."""
 
 
 def registry() -> Registry:
     """Returns the forecast model registry."""
+    global _registry
+    if _registry is None:
+        _registry = Registry()
     return _registry